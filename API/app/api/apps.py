@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import doctor_cache, response_cache, sharding  # noqa: F401
+        from .timing import instrument_serializers
+
+        instrument_serializers()
@@ -0,0 +1,193 @@
+"""
+Latency and query benchmark of the API endpoints against a seeded circle
+
+benchmark_endpoints.json lists one or more requests per route of api/urls.py,
+with {placeholders} filled from the seeded data; routes whose view is a stub
+carry a "skip" reason instead of being measured. Each request is replayed
+through the Django test client, writes inside a rolled back transaction so
+every iteration sees the same data. Results are plain dicts, dumped as JSON
+by the benchmark command and compared against a stored baseline.
+"""
+from django.conf import settings
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import URLResolver, get_resolver, resolve
+from datetime import date, timedelta
+from contextlib import ExitStack
+from pathlib import Path
+from urllib.parse import urlsplit
+from chap.models import CompletedChapter
+from eig.models import CompletedQuarter
+from .seeding import CircleSeeder
+from .sharding import shard_for_doctor, use_shard
+from .timing import SqlTimer
+from .utils import encode
+import json
+import math
+import time
+
+ENDPOINTS_PATH = Path(__file__).with_name("benchmark_endpoints.json")
+API_PREFIX = "api/v1/"
+
+# Relative slowdown and absolute floor, in milliseconds, of a latency regression
+TOLERANCE = 0.25
+MIN_DELTA_MS = 1.0
+
+
+def load_endpoints(path=ENDPOINTS_PATH):
+    with open(path) as manifest:
+        return json.load(manifest)["endpoints"]
+
+
+def api_routes():
+    """
+    Routes of every view under api/urls.py, as reported by ResolverMatch.route
+    """
+    routes = []
+
+    def collect(patterns, prefix):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                collect(pattern.url_patterns, prefix + str(pattern.pattern))
+            else:
+                routes.append(prefix + str(pattern.pattern))
+
+    collect(get_resolver().url_patterns, "")
+    return sorted({route for route in routes if route.startswith(API_PREFIX)})
+
+
+def endpoint_route(path):
+    return resolve(urlsplit(path).path).route
+
+
+def seed(doctors=2, students_per_doctor=20, years=1, end=None, seed=0):
+    """
+    Seed synthetic circles over the given years up to end (see api.seeding)
+    Returns the values of the manifest placeholders, from the first circle
+    """
+    end = end or date.today()
+    seeder = CircleSeeder(seed, end - timedelta(days=365 * years - 1), end)
+    circles = [seeder.seed_doctor(index, students_per_doctor) for index in range(doctors)]
+
+    doctor, students = circles[0]
+    with use_shard(shard_for_doctor(doctor) if settings.SHARD_COUNT else None):
+        student = next((row for row in students if row.memorization_method == "chapter"), students[0])
+        eighth_student = next((row for row in students if row.memorization_method == "eighth"), students[0])
+        return {
+            "doctor": doctor.code,
+            "student": student.code,
+            "eighth_student": eighth_student.code,
+            "chapter_completion": CompletedChapter.objects.filter(student=student).values_list("code", flat=True).last(),
+            "quarter_completion": CompletedQuarter.objects.filter(student=eighth_student).values_list("code", flat=True).last(),
+            "date": end.isoformat(),
+            "month_start": end.replace(day=1).isoformat(),
+            "year": end.year,
+            "month": end.month,
+        }
+
+
+def fill(value, placeholders):
+    """
+    Fill the {placeholders} of a manifest path or body
+    """
+    if isinstance(value, str):
+        return value.format(**placeholders)
+    if isinstance(value, list):
+        return [fill(item, placeholders) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, placeholders) for key, item in value.items()}
+    return value
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of a non-empty list
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def doctor_client(token):
+    """
+    Test client of the seeded doctor, fresh for each request since the login
+    and signup responses replace its cookies
+    """
+    client = Client(raise_request_exception=False)
+    client.cookies[settings.TOKEN_ACCESS_NAME] = token
+    return client
+
+
+def send(client, method, path, data):
+    if data is None:
+        return getattr(client, method)(path)
+    return getattr(client, method)(path, json.dumps(data), content_type="application/json")
+
+
+def measure(client, method, path, data):
+    """
+    Send one request and return its status, duration and SQL count and time,
+    over every database. Writes are rolled back
+    """
+    aliases = list(connections)
+    timer = SqlTimer()
+    with ExitStack() as stack:
+        if method != "get":
+            for alias in aliases:
+                stack.enter_context(transaction.atomic(using=alias))
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(timer))
+        started = time.perf_counter()
+        response = send(client, method, path, data)
+        elapsed = time.perf_counter() - started
+        if method != "get":
+            for alias in aliases:
+                transaction.set_rollback(True, using=alias)
+    return response.status_code, elapsed, timer.count, timer.seconds
+
+
+def run(placeholders, iterations=20, endpoints=None):
+    """
+    Benchmark each endpoint not marked skip after one warm-up request
+    Returns the results per endpoint name, durations in milliseconds
+    """
+    endpoints = endpoints or load_endpoints()
+    token = encode(minutes=60, code=str(placeholders["doctor"]))
+    results = {}
+    for name, endpoint in endpoints.items():
+        if endpoint.get("skip"):
+            continue
+        method = endpoint.get("method", "get")
+        path = fill(endpoint["path"], placeholders)
+        data = fill(endpoint.get("data"), placeholders)
+        measure(doctor_client(token), method, path, data)
+        samples = [measure(doctor_client(token), method, path, data) for _ in range(iterations)]
+        latencies = [elapsed * 1000 for _, elapsed, _, _ in samples]
+        results[name] = {
+            "method": method.upper(),
+            "path": path,
+            "status": samples[-1][0],
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "queries": max(queries for _, _, queries, _ in samples),
+            "sql_ms": round(percentile([sql * 1000 for _, _, _, sql in samples], 50), 3),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_delta_ms=MIN_DELTA_MS):
+    """
+    Return the regressions of results against a baseline run: more queries,
+    or a p95 latency slower by more than both tolerance and min_delta_ms
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["queries"] > previous["queries"]:
+            regressions.append(f"{name}: {previous['queries']} -> {result['queries']} queries")
+        delta = result["p95_ms"] - previous["p95_ms"]
+        if delta > min_delta_ms and delta > previous["p95_ms"] * tolerance:
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {result['p95_ms']} ms")
+    return regressions
@@ -0,0 +1,107 @@
+"""
+Allocation of the 6-digit doctor and student codes
+
+Each sequence is a counter in a CodeSequence row. The n-th code is a keyed
+Feistel permutation of n over the 900000 codes from 100000 to 999999, so
+codes are unique without probing the Doctor or Student tables and do not
+follow each other. Codes given out at random before the sequences existed
+are recorded as ReservedCode rows and skipped.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from .models import CodeSequence, ReservedCode
+import hashlib
+import secrets
+import threading
+
+CODE_MIN = 100000
+CODE_SPACE = 900000
+ROUNDS = 4
+
+_reserved = {}
+_reserved_lock = threading.Lock()
+
+
+class CodeSpaceExhausted(RuntimeError):
+    pass
+
+
+def permute(value, key, space=CODE_SPACE):
+    """
+    Map value in [0, space) to a distinct value in [0, space), with a
+    balanced Feistel network over the smallest even number of bits covering
+    space, cycle-walking the results that fall outside it
+    """
+    half_bits = ((space - 1).bit_length() + 1) // 2
+    mask = (1 << half_bits) - 1
+    key = key.encode()
+    while True:
+        left, right = value >> half_bits, value & mask
+        for round_index in range(ROUNDS):
+            digest = hashlib.blake2b(
+                f"{round_index}:{right}".encode(), key=key, digest_size=8
+            ).digest()
+            left, right = right, left ^ (int.from_bytes(digest, "big") & mask)
+        value = (left << half_bits) | right
+        if value < space:
+            return value
+
+
+def advance(name):
+    """
+    Increment the sequence and return its previous value and its key
+    The increment takes the row's write lock, so concurrent workers never
+    read the same value
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(CodeSequence._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.features.can_return_columns_from_insert:
+            cursor.execute(
+                f'UPDATE {table} SET "value" = "value" + 1 WHERE "name" = %s RETURNING "value", "key"',
+                [name],
+            )
+            row = cursor.fetchone()
+        else:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                cursor.execute(f'UPDATE {table} SET "value" = "value" + 1 WHERE "name" = %s', [name])
+                cursor.execute(f'SELECT "value", "key" FROM {table} WHERE "name" = %s', [name])
+                row = cursor.fetchone()
+    if row is None:
+        CodeSequence.objects.get_or_create(name=name, defaults={"key": secrets.token_hex(16)})
+        return advance(name)
+    return row[0] - 1, row[1]
+
+
+def reserved_codes(name):
+    """
+    Codes of the sequence recorded before it existed, read once per process
+    from every database holding them
+    """
+    from .sharding import shard_aliases
+
+    with _reserved_lock:
+        if name not in _reserved:
+            codes = set()
+            for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]:
+                codes.update(
+                    ReservedCode.objects.using(alias)
+                    .filter(sequence=name)
+                    .values_list("code", flat=True)
+                )
+            _reserved[name] = frozenset(codes)
+        return _reserved[name]
+
+
+def next_code(name):
+    """
+    Return the next code of the sequence, raising CodeSpaceExhausted once
+    every 6-digit code has been used
+    """
+    reserved = reserved_codes(name)
+    while True:
+        value, key = advance(name)
+        if value >= CODE_SPACE:
+            raise CodeSpaceExhausted(f"All {CODE_SPACE} {name} codes are used")
+        code = CODE_MIN + permute(value, key)
+        if code not in reserved:
+            return code
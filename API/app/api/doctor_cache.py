@@ -0,0 +1,57 @@
+"""
+Per-worker LRU cache of Doctor rows with a short TTL, so authenticated
+requests do not query the Doctor table on every call
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.conf import settings
+from collections import OrderedDict
+from .models import Doctor
+from . import metrics
+import threading
+import copy
+import time
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_doctor(code):
+    """
+    Return the Doctor with the given code, or None, from the cache when fresh
+    """
+    code = str(code)
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(code)
+        if entry and entry[0] > now:
+            _cache.move_to_end(code)
+            metrics.cache_requests.inc("doctor", "hit")
+            return copy.copy(entry[1])
+
+    metrics.cache_requests.inc("doctor", "miss")
+    doctor = Doctor.objects.filter(code=code).first()
+    if doctor is None:
+        return None
+    with _lock:
+        _cache[code] = (now + settings.DOCTOR_CACHE_TTL, doctor)
+        _cache.move_to_end(code)
+        while len(_cache) > settings.DOCTOR_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return copy.copy(doctor)
+
+
+def invalidate_doctor(code):
+    with _lock:
+        _cache.pop(str(code), None)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_cached_doctor(sender, instance, **kwargs):
+    invalidate_doctor(instance.code)
@@ -0,0 +1,101 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from api import benchmark
+from api.sharding import shard_aliases
+import json
+import os
+
+REFERENCE_FIXTURES = [
+    os.path.join(settings.BASE_DIR, "chap", "initial_data.json"),
+    os.path.join(settings.BASE_DIR, "eig", "initial_data.json"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with a circle of the given size and report "
+        "p50/p95/p99 latency, query count and SQL time of every API endpoint as JSON. "
+        "With --baseline, exit with an error when an endpoint regressed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctors", type=int, default=2)
+        parser.add_argument("--students", type=int, default=20, help="Students per doctor")
+        parser.add_argument("--years", type=int, default=1, help="Years of attendance, sessions and payments")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+        parser.add_argument("--iterations", type=int, default=20, help="Measured requests per endpoint")
+        parser.add_argument("--endpoint", action="append", help="Only benchmark these endpoint names")
+        parser.add_argument(
+            "--response-cache",
+            action="store_true",
+            help="Keep the per-doctor response cache enabled (cached reads hide the data volume)",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+        parser.add_argument("--baseline", help="JSON report to compare against")
+        parser.add_argument("--tolerance", type=float, default=benchmark.TOLERANCE)
+        parser.add_argument("--min-delta-ms", type=float, default=benchmark.MIN_DELTA_MS)
+
+    def handle(self, *args, **options):
+        endpoints = benchmark.load_endpoints()
+        if options["endpoint"]:
+            unknown = set(options["endpoint"]) - set(endpoints)
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            endpoints = {name: endpoints[name] for name in options["endpoint"]}
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as report:
+                baseline = json.load(report)["endpoints"]
+
+        config = {
+            "doctors": options["doctors"],
+            "students_per_doctor": options["students"],
+            "years": options["years"],
+            "seed": options["seed"],
+            "iterations": options["iterations"],
+            "response_cache": options["response_cache"],
+            "database": settings.DATABASES[DEFAULT_DB_ALIAS]["ENGINE"],
+            "shards": settings.SHARD_COUNT,
+        }
+        # The benchmark runs in one process, so even a LocMemCache (off by default) is correct
+        timeout = (settings.RESPONSE_CACHE_TIMEOUT or 300) if options["response_cache"] else 0
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(RESPONSE_CACHE_TIMEOUT=timeout):
+                for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]:
+                    call_command("loaddata", *REFERENCE_FIXTURES, database=alias, verbosity=0)
+                placeholders = benchmark.seed(
+                    options["doctors"], options["students"], options["years"], seed=options["seed"]
+                )
+                results = benchmark.run(placeholders, options["iterations"], endpoints)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = json.dumps({"config": config, "endpoints": results}, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+        failed = [name for name, result in results.items() if result["status"] >= 400]
+        if failed:
+            self.stderr.write(f"Endpoints answering with an error: {', '.join(failed)}")
+        if baseline is not None:
+            regressions = benchmark.compare(
+                results, baseline, options["tolerance"], options["min_delta_ms"]
+            )
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+            self.stderr.write("No regressions against the baseline")
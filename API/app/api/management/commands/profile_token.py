@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from api.profiling import profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a token enabling the profiling of single requests, sent in the "
+        "X-Profile header or the profile query parameter. It is valid for "
+        "PROFILE_TOKEN_MAX_AGE seconds on servers running with PROFILING=True"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("issued_to", help="Who the token is for, logged with each profile")
+
+    def handle(self, *args, **options):
+        self.stdout.write(profile_token(options["issued_to"]))
+        self.stderr.write(f"Valid for {settings.PROFILE_TOKEN_MAX_AGE} seconds")
@@ -0,0 +1,121 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from api.doctor_cache import invalidate_doctor
+from api.models import Doctor
+from api.sharding import shard_aliases, shard_for_doctor, use_shard
+from att.models import Attendance
+from chap.models import CompletedChapter
+from eig.models import CompletedQuarter
+from pay.models import Payment
+from stu.models import Student, StudentStats
+
+BATCH_SIZE = 500
+
+# Tables moved with a doctor, parents first, and the lookup of the doctor's rows
+MOVED_MODELS = [
+    (Student, "doctor"),
+    (StudentStats, "student__doctor"),
+    (Attendance, "student__doctor"),
+    (CompletedChapter, "student__doctor"),
+    (CompletedQuarter, "student__doctor"),
+    (Payment, "student__doctor"),
+]
+
+
+def copy_doctor_rows(doctor, source, target):
+    """
+    Copy the doctor's mirror and rows from source into target with their
+    primary keys, which clients keep (attendance ids, completion codes)
+    Returns the number of copied rows per model name
+    """
+    fields = [field.attname for field in Doctor._meta.concrete_fields]
+    Doctor.objects.using(target).bulk_create(
+        [Doctor(**{name: getattr(doctor, name) for name in fields})],
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=[name for name in fields if name != "code"],
+    )
+    copied = {}
+    for model, lookup in MOVED_MODELS:
+        rows = list(model.objects.using(source).filter(**{lookup: doctor.code}))
+        if isinstance(model._meta.pk, models.AutoField):
+            # Shards hand out ids from separate ranges (see api.sharding), only
+            # rows written before those ranges can collide
+            taken = []
+            keys = [row.pk for row in rows]
+            for start in range(0, len(keys), BATCH_SIZE):
+                taken += model.objects.using(target).filter(
+                    pk__in=keys[start : start + BATCH_SIZE]
+                ).values_list("pk", flat=True)
+            if taken:
+                raise CommandError(
+                    f"{model.__name__} ids {', '.join(map(str, sorted(taken)[:10]))} "
+                    f"of doctor {doctor.code} already exist in {target}"
+                )
+        model.objects.using(target).bulk_create(rows, batch_size=BATCH_SIZE)
+        copied[model.__name__] = len(rows)
+    return copied
+
+
+def move_doctor(doctor, source, target):
+    """
+    Move the doctor's students and dependent rows from source to target and
+    record target as the doctor's shard
+    The doctor itself stays in the default database
+    """
+    with transaction.atomic(using=target), transaction.atomic(using=source):
+        copied = copy_doctor_rows(doctor, source, target)
+        with use_shard(source):
+            if source == DEFAULT_DB_ALIAS:
+                Student.objects.using(source).filter(doctor=doctor.code).delete()
+            else:
+                Doctor.objects.using(source).filter(code=doctor.code).delete()
+    Doctor.objects.filter(code=doctor.code).update(shard=int(target.removeprefix("shard_")))
+    invalidate_doctor(doctor.code)
+    return copied
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a doctor's students and their rows to another shard, or move the rows "
+        "written to the default database before sharding into each doctor's shard. "
+        "Run it with the API stopped: workers keep cached doctors for DOCTOR_CACHE_TTL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctor", help="Code of the doctor to move")
+        parser.add_argument("--to", type=int, help="Index of the target shard")
+        parser.add_argument(
+            "--import-default",
+            action="store_true",
+            help="Move every doctor's rows from the default database into its shard",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SHARD_COUNT:
+            raise CommandError("Sharding is disabled, set SHARD_COUNT")
+
+        if options["import_default"]:
+            for doctor in Doctor.objects.order_by("code"):
+                self.move(doctor, DEFAULT_DB_ALIAS, shard_for_doctor(doctor))
+            return
+
+        if not options["doctor"] or options["to"] is None:
+            raise CommandError("Pass --doctor and --to, or --import-default")
+        target = f"shard_{options['to']}"
+        if target not in shard_aliases():
+            raise CommandError(f"Shard {options['to']} does not exist")
+        try:
+            doctor = Doctor.objects.get(code=options["doctor"])
+        except Doctor.DoesNotExist:
+            raise CommandError(f"Doctor {options['doctor']} not found")
+        source = shard_for_doctor(doctor)
+        if source == target:
+            raise CommandError(f"Doctor {doctor.code} is already in {target}")
+        self.move(doctor, source, target)
+
+    def move(self, doctor, source, target):
+        copied = move_doctor(doctor, source, target)
+        counts = ", ".join(f"{count} {name}" for name, count in copied.items())
+        self.stdout.write(f"Moved doctor {doctor.code} from {source} to {target}: {counts}")
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date, timedelta
+from api.seeding import BATCH_SIZE, CircleSeeder
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert synthetic doctors with their students, attendance, chapter and eighth "
+        "sessions and payments, deterministically from --seed. Rows are streamed "
+        "through bulk_create in batches, one transaction per doctor"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctors", type=int, default=10)
+        parser.add_argument("--students", type=int, default=30, help="Students per doctor")
+        parser.add_argument("--years", type=int, default=1, help="Years of history up to --end")
+        parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day (default today)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--eighth-share",
+            type=float,
+            default=0.4,
+            help="Share of students following the eighth method",
+        )
+
+    def handle(self, *args, **options):
+        if options["doctors"] < 1 or options["students"] < 1 or options["years"] < 1:
+            raise CommandError("--doctors, --students and --years must be positive")
+        if not 0 <= options["eighth_share"] <= 1:
+            raise CommandError("--eighth-share must be between 0 and 1")
+        end = options["end"] or date.today()
+        start = end - timedelta(days=365 * options["years"] - 1)
+        seeder = CircleSeeder(
+            options["seed"], start, end, options["batch_size"], options["eighth_share"]
+        )
+        started = time.perf_counter()
+        for index in range(options["doctors"]):
+            doctor, students = seeder.seed_doctor(index, options["students"])
+            self.stdout.write(f"Doctor {doctor.code}: {len(students)} students")
+        elapsed = time.perf_counter() - started
+        rows = sum(seeder.counts.values())
+        counts = ", ".join(f"{count} {name}" for name, count in seeder.counts.items())
+        self.stdout.write(
+            f"Seeded {counts} from {start} to {end} in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)"
+        )
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Command(BaseCommand):
+    help = "Refresh SQLite planner statistics, reclaim free pages and checkpoint the WAL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run a full ANALYZE instead of letting PRAGMA optimize pick tables",
+        )
+        parser.add_argument(
+            "--vacuum-pages",
+            type=int,
+            default=0,
+            help="Free at most this many pages with incremental vacuum (default all)",
+        )
+        parser.add_argument(
+            "--enable-incremental-vacuum",
+            action="store_true",
+            help="Switch the database to auto_vacuum=INCREMENTAL, rewriting it with a full VACUUM once",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError(f"Database {options['database']} is not SQLite")
+
+        with connection.cursor() as cursor:
+            if options["enable_incremental_vacuum"]:
+                cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                cursor.execute("VACUUM")
+                self.stdout.write("Enabled incremental vacuum")
+
+            if options["analyze"]:
+                cursor.execute("ANALYZE")
+                self.stdout.write("Analyzed all tables")
+            else:
+                cursor.execute("PRAGMA optimize")
+                self.stdout.write("Optimized planner statistics")
+
+            cursor.execute("PRAGMA auto_vacuum")
+            if cursor.fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+                cursor.execute("PRAGMA freelist_count")
+                free_pages = cursor.fetchone()[0]
+                cursor.execute(f"PRAGMA incremental_vacuum({options['vacuum_pages']})")
+                cursor.fetchall()
+                cursor.execute("PRAGMA freelist_count")
+                self.stdout.write(
+                    f"Reclaimed {free_pages - cursor.fetchone()[0]} of {free_pages} free pages"
+                )
+            else:
+                self.stdout.write(
+                    "Incremental vacuum is not enabled, see --enable-incremental-vacuum"
+                )
+
+            cursor.execute("PRAGMA journal_mode")
+            if cursor.fetchone()[0] == "wal":
+                cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                busy, log_pages, checkpointed = cursor.fetchone()
+                self.stdout.write(
+                    f"Checkpointed {checkpointed} of {log_pages} WAL pages"
+                    + (" (busy)" if busy else "")
+                )
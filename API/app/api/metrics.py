@@ -0,0 +1,257 @@
+"""
+Prometheus metrics of the API, aggregated across the gunicorn workers
+
+With METRICS_DIR set, each process adds to its own memory-mapped file
+(values_<pid>.db), a table of (sample key, double) entries as in
+prometheus_client's multiprocess mode, and metrics_text() sums the files of
+every worker, exited ones included so counters never go backwards. The
+directory must be emptied when the server starts (the entry script does).
+Without METRICS_DIR the values stay in the process.
+
+Histograms keep cumulative bucket counts, so summing the files keeps them
+valid.
+"""
+from django.conf import settings
+from collections import defaultdict
+from pathlib import Path
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+
+INITIAL_SIZE = 64 * 1024
+# Header: bytes used, then padding to keep the values aligned
+HEADER = struct.Struct("i4x")
+KEY_LENGTH = struct.Struct("i")
+VALUE = struct.Struct("d")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class MmapValues:
+    """
+    Values of one process in a memory-mapped file, written by that process
+    only and read by any
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.positions = {}
+        self.lock = threading.Lock()
+        self.file = open(path, "a+b")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(INITIAL_SIZE)
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.mmap = mmap.mmap(self.file.fileno(), self.size)
+        self.used = HEADER.unpack_from(self.mmap, 0)[0]
+        if not self.used:
+            self.used = HEADER.size
+            HEADER.pack_into(self.mmap, 0, self.used)
+        for key, _, position in read_entries(self.mmap, self.used):
+            self.positions[key] = position
+
+    def add(self, key, amount):
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self.append(key)
+            value = VALUE.unpack_from(self.mmap, position)[0]
+            VALUE.pack_into(self.mmap, position, value + amount)
+
+    def append(self, key):
+        encoded = key.encode()
+        # Pad so the value after the key stays 8-byte aligned
+        padded = KEY_LENGTH.size + len(encoded) + (8 - (KEY_LENGTH.size + len(encoded)) % 8)
+        entry = padded + VALUE.size
+        if self.used + entry > self.size:
+            self.grow(self.used + entry)
+        KEY_LENGTH.pack_into(self.mmap, self.used, len(encoded))
+        self.mmap[self.used + KEY_LENGTH.size : self.used + KEY_LENGTH.size + len(encoded)] = encoded
+        position = self.used + padded
+        VALUE.pack_into(self.mmap, position, 0.0)
+        # Readers only see the entry once it is complete
+        self.used += entry
+        HEADER.pack_into(self.mmap, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def grow(self, needed):
+        while self.size < needed:
+            self.size *= 2
+        self.mmap.close()
+        self.file.truncate(self.size)
+        self.mmap = mmap.mmap(self.file.fileno(), self.size)
+
+
+class MemoryValues:
+    def __init__(self):
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def add(self, key, amount):
+        with self.lock:
+            self.values[key] += amount
+
+
+def read_entries(buffer, used):
+    """
+    Yield the (key, value, value position) entries of a values file
+    """
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(buffer, position)[0]
+        key = bytes(buffer[position + KEY_LENGTH.size : position + KEY_LENGTH.size + length]).decode()
+        padded = KEY_LENGTH.size + length + (8 - (KEY_LENGTH.size + length) % 8)
+        value_position = position + padded
+        yield key, VALUE.unpack_from(buffer, value_position)[0], value_position
+        position = value_position + VALUE.size
+
+
+def read_file(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        return {}
+    used = HEADER.unpack_from(data, 0)[0]
+    return {key: value for key, value, _ in read_entries(data, used)}
+
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+
+def store():
+    """
+    Values of the current process, reopened after a fork
+    """
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store_pid != pid:
+        with _store_lock:
+            if _store_pid != pid:
+                if settings.METRICS_DIR:
+                    directory = Path(settings.METRICS_DIR)
+                    directory.mkdir(parents=True, exist_ok=True)
+                    _store = MmapValues(directory / f"values_{pid}.db")
+                else:
+                    _store = MemoryValues()
+                _store_pid = pid
+    return _store
+
+
+def collect():
+    """
+    Summed values of every process sharing METRICS_DIR, else of this one
+    """
+    if not settings.METRICS_DIR:
+        with store().lock:
+            return dict(store().values)
+    totals = defaultdict(float)
+    for path in sorted(Path(settings.METRICS_DIR).glob("values_*.db")):
+        for key, value in read_file(path).items():
+            totals[key] += value
+    return totals
+
+
+class Metric:
+    """
+    A metric family; samples are keyed by their name and label values
+    """
+
+    families = {}
+
+    def __init__(self, name, kind, documentation, labels=()):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labels = labels
+        Metric.families[name] = self
+
+    def key(self, sample, values, extra=()):
+        return json.dumps([sample, [*zip(self.labels, values), *extra]])
+
+
+class Counter(Metric):
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, "counter", documentation, labels)
+
+    def inc(self, *values, amount=1):
+        if settings.METRICS_ENABLED:
+            store().add(self.key(self.name, values), amount)
+
+
+class Histogram(Metric):
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, "histogram", documentation, labels)
+        self.buckets = [*buckets, math.inf]
+
+    def observe(self, value, *values):
+        if not settings.METRICS_ENABLED:
+            return
+        values_store = store()
+        # Every bucket is written, empty ones included, so each series has them all
+        for bound in self.buckets:
+            bucket = self.key(f"{self.name}_bucket", values, [("le", format_value(bound))])
+            values_store.add(bucket, 1 if value <= bound else 0)
+        values_store.add(self.key(f"{self.name}_sum", values), value)
+        values_store.add(self.key(f"{self.name}_count", values), 1)
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def metrics_text():
+    """
+    Every sample in the Prometheus text exposition format (version 0.0.4)
+    """
+    samples = defaultdict(list)
+    for key, value in collect().items():
+        sample, labels = json.loads(key)
+        family = sample if sample in Metric.families else sample.rsplit("_", 1)[0]
+        samples[family].append((sample, labels, value))
+    lines = []
+    for name, metric in sorted(Metric.families.items()):
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for sample, labels, value in sorted(samples[name], key=sample_order):
+            label_text = ",".join(f'{label}="{escape(item)}"' for label, item in labels)
+            lines.append(f"{sample}{{{label_text}}} {format_value(value)}" if labels else f"{sample} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def sample_order(sample):
+    name, labels, _ = sample
+    # Buckets in increasing order of their bound, +Inf last
+    bound = next((float(item) for label, item in labels if label == "le"), 0.0)
+    return name, [item for item in labels if item[0] != "le"], bound
+
+
+requests_total = Counter(
+    "circle_http_requests_total", "Requests by route, method and status code", ("route", "method", "status")
+)
+request_duration = Histogram(
+    "circle_http_request_duration_seconds", "Request latency by route", ("route", "method")
+)
+db_queries = Histogram(
+    "circle_db_queries_per_request", "SQL queries run by each request, by route", ("route",), QUERY_BUCKETS
+)
+db_seconds = Counter("circle_db_query_seconds_total", "Time spent in SQL queries, by route", ("route",))
+cache_requests = Counter(
+    "circle_cache_requests_total", "Lookups in the doctor and response caches by result", ("cache", "result")
+)
+auth_failures = Counter(
+    "circle_auth_failures_total", "Requests to authenticated endpoints rejected, by reason", ("reason",)
+)
@@ -1,6 +1,9 @@
 from django.conf import settings
+import logging
 import jwt
 
+logger = logging.getLogger(__name__)
+
 
 class AuthenticationMiddleware:
     def __init__(self, get_response):
@@ -14,18 +17,20 @@ class AuthenticationMiddleware:
                     token, settings.JWT_SECRET_KEY, algorithms=["HS256"]
                 )
                 request.code = payload.get("code")
-                print(f"✅ Auth: Valid token for code: {request.code} | Path: {request.path}")
+                logger.debug("Valid token for code %s | Path: %s", request.code, request.path)
             except jwt.ExpiredSignatureError:
                 request.code = None
-                print(f"❌ Auth: Token expired | Path: {request.path}")
+                request.auth_failure = "expired"
+                logger.info("Token expired | Path: %s", request.path)
             except jwt.InvalidTokenError:
                 request.code = None
-                print(f"❌ Auth: Invalid token | Path: {request.path}")
+                request.auth_failure = "invalid"
+                logger.warning("Invalid token | Path: %s", request.path)
         else:
             request.code = None
             # Only log for API paths (ignore static files)
             if request.path.startswith('/api/'):
-                print(f"⚠️  Auth: No token found | Path: {request.path} | Cookies: {list(request.COOKIES.keys())}")
+                logger.debug("No token found | Path: %s", request.path)
 
         response = self.get_response(request)
         return response
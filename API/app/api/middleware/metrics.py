@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from api import metrics
+from api.timing import time_request
+import time
+
+
+class MetricsMiddleware:
+    """
+    Record each request's latency, status and SQL in the Prometheus metrics
+    Removed from the middleware chain unless METRICS_ENABLED is set
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with time_request() as timer:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        # Unmatched paths share one label to bound the number of series
+        route = match.route if match else "unmatched"
+        metrics.requests_total.inc(route, request.method, response.status_code)
+        metrics.request_duration.observe(elapsed, route, request.method)
+        metrics.db_queries.observe(timer.sql.count, route)
+        metrics.db_seconds.inc(route, amount=timer.sql.seconds)
+        return response
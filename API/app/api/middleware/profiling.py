@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from api import profiling
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Profile the requests carrying a valid profiling token, and sample the
+    stacks of the others with PROFILE_SAMPLING (see api.profiling)
+    Removed from the middleware chain unless PROFILING or PROFILE_SAMPLING is set
+    """
+
+    def __init__(self, get_response):
+        if not (settings.PROFILING or settings.PROFILE_SAMPLING):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.routes = set(settings.PROFILE_SAMPLING_ROUTES)
+
+    def __call__(self, request):
+        token = request.headers.get("X-Profile") or request.GET.get("profile")
+        if token and settings.PROFILING:
+            issued_to = profiling.check_token(token)
+            if issued_to is None:
+                logger.warning("Invalid profiling token | Path: %s", request.path)
+            else:
+                return self.profile(request, issued_to)
+        try:
+            return self.get_response(request)
+        finally:
+            if getattr(request, "sampled", False):
+                profiling.sampler().stop()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # The route is only known once the URL is resolved
+        route = request.resolver_match.route
+        if settings.PROFILE_SAMPLING and not getattr(request, "profiling", False):
+            if not self.routes or route in self.routes:
+                profiling.sampler().start(route)
+                request.sampled = True
+
+    def profile(self, request, issued_to):
+        # Cached responses would hide the view's work, see api.response_cache
+        request.profiling = True
+        with profiling.profile_request() as (profile, timeline):
+            response = self.get_response(request)
+        match = request.resolver_match
+        report = {
+            "method": request.method,
+            "path": request.path,
+            "route": match.route if match else None,
+            "status": response.status_code,
+            "doctor": getattr(request, "code", None),
+            "issued_to": issued_to,
+            "total_ms": timeline.total_ms,
+            "sql_ms": round(sum(query["duration_ms"] for query in timeline.queries), 3),
+            "queries": timeline.queries,
+            "call_tree": profiling.call_tree(profile),
+        }
+        name = profiling.save_profile(report, profile)
+        logger.info("Profiled %s %s for %s into %s", request.method, request.path, issued_to, name)
+        if request.GET.get("profile_output") == "inline":
+            return JsonResponse(report)
+        response["X-Profile-Report"] = name
+        return response
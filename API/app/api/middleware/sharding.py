@@ -0,0 +1,33 @@
+from django.conf import settings
+from api.doctor_cache import get_doctor
+from api.sharding import _current_shard, current_shard, locate_student, shard_for_doctor
+
+
+class ShardMiddleware:
+    """
+    Select the shard of the authenticated doctor, or of the student in the
+    URL for the student portal routes, for the rest of the request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SHARD_COUNT:
+            return self.get_response(request)
+        alias = None
+        code = getattr(request, "code", None)
+        if code:
+            doctor = get_doctor(code)
+            if doctor:
+                alias = shard_for_doctor(doctor)
+        token = _current_shard.set(alias)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_shard.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.SHARD_COUNT and current_shard() is None and "student_code" in view_kwargs:
+            # Unknown students are looked up in shard_0 to get the usual not found
+            _current_shard.set(locate_student(view_kwargs["student_code"]) or "shard_0")
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from api.timing import time_request
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TimingMiddleware:
+    """
+    Measure each request's total, SQL and serializer time, send them in a
+    Server-Timing header and log one JSON line per request
+    Removed from the middleware chain unless REQUEST_TIMING is set
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with time_request(settings.SLOW_QUERY_MS) as timer:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        sql_ms = timer.sql.seconds * 1000
+        serialize_ms = timer.serialize_seconds * 1000
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={sql_ms:.1f};desc="{timer.sql.count} queries"',
+            f"serialize;dur={serialize_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ])
+        match = request.resolver_match
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "route": match.route if match else None,
+            "status": response.status_code,
+            "doctor": getattr(request, "code", None),
+            "queries": timer.sql.count,
+            "sql_ms": round(sql_ms, 2),
+            "serialize_ms": round(serialize_ms, 2),
+            "total_ms": round(total_ms, 2),
+        }))
+        return response
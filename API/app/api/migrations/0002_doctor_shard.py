@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='shard',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
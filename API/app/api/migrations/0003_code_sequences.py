@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+def reserve_existing_codes(apps, schema_editor):
+    """
+    Record the codes drawn at random so far, for the allocator to skip
+    """
+    alias = schema_editor.connection.alias
+    ReservedCode = apps.get_model("api", "ReservedCode")
+    for sequence, model in (("doctor", ("api", "Doctor")), ("student", ("stu", "Student"))):
+        codes = apps.get_model(*model).objects.using(alias).values_list("code", flat=True)
+        ReservedCode.objects.using(alias).bulk_create(
+            [
+                ReservedCode(sequence=sequence, code=int(code))
+                for code in codes
+                if code.isdigit() and 100000 <= int(code) <= 999999
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_doctor_shard'),
+        ('stu', '0008_studentstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeSequence',
+            fields=[
+                ('name', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=64)),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'CodeSequence',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReservedCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.CharField(max_length=20)),
+                ('code', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'ReservedCode',
+                'constraints': [models.UniqueConstraint(fields=('sequence', 'code'), name='unique_reserved_code')],
+            },
+        ),
+        migrations.RunPython(reserve_existing_codes, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,10 @@
 from django.db import models
-import random
 
 
 def generate_doctor_code():
-    while True:
-        code = random.randint(100000, 999999)
-        if not Doctor.objects.filter(code=code).exists():
-            return code
+    from .codes import next_code
+
+    return next_code("doctor")
 
 
 class Doctor(models.Model):
@@ -19,6 +17,9 @@ class Doctor(models.Model):
     last_name = models.CharField(max_length=35)
     phone_number = models.CharField(max_length=10, blank=True, null=True)
     email = models.EmailField()
+    # Shard index of the doctor's students when sharding is enabled,
+    # None places the doctor by code (see api.sharding)
+    shard = models.PositiveSmallIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"Doctor: {self.first_name} {self.last_name}, Email: {self.email}, Verified: {self.verified}, Code: {self.code}, Phone: {self.phone_number}"
@@ -28,6 +29,35 @@ class Doctor(models.Model):
         ordering = ["first_name", "last_name"]
 
 
+class CodeSequence(models.Model):
+    """
+    Counter behind the doctor and student codes, each value is turned into a
+    6-digit code by a permutation keyed with key (see api.codes)
+    """
+
+    name = models.CharField(max_length=20, primary_key=True)
+    key = models.CharField(max_length=64)
+    value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "CodeSequence"
+
+
+class ReservedCode(models.Model):
+    """
+    Codes handed out at random before CodeSequence, skipped by the allocator
+    """
+
+    sequence = models.CharField(max_length=20)
+    code = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "ReservedCode"
+        constraints = [
+            models.UniqueConstraint(fields=["sequence", "code"], name="unique_reserved_code")
+        ]
+
+
 # from django.db import models
 # from django.core.validators import MinValueValidator, MaxValueValidator
 # import random
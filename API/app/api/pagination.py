@@ -0,0 +1,140 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django.db.models import F, Q
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
+from functools import reduce
+import operator
+import base64
+import json
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a descending composite key, e.g.
+    ("completion_date", "code"), with an updated_since filter for incremental sync.
+
+    Query params:
+    - limit: page size, enables pagination (responses become {"results", "next_cursor"})
+    - cursor: opaque next_cursor returned by the previous page, enables pagination
+    - updated_since: YYYY-MM-DD or ISO datetime, only rows updated since then
+
+    Without limit and cursor the full list is returned unchanged, for existing clients.
+    """
+
+    default_limit = 50
+    max_limit = 500
+
+    def __init__(self, keys, updated_field="updated_at"):
+        self.keys = keys
+        self.updated_field = updated_field
+        self.paginated = False
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        model = queryset.model
+        queryset = self.filter_updated_since(queryset, request.query_params.get("updated_since"))
+
+        limit = request.query_params.get("limit")
+        cursor = request.query_params.get("cursor")
+        if limit is None and cursor is None:
+            return list(self.order(queryset))
+
+        limit = self.get_limit(limit)
+        if cursor:
+            after = self.after(model, self.decode_cursor(model, cursor))
+            queryset = queryset.filter(after) if after is not None else queryset.none()
+        return self.page(queryset, limit)
+
+    def page(self, queryset, limit):
+        """
+        Return the first limit rows of queryset in key order, setting
+        next_cursor when more rows follow
+        """
+        self.paginated = True
+        rows = list(self.order(queryset)[: limit + 1])
+        if len(rows) > limit:
+            rows = rows[:limit]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def order(self, queryset):
+        return queryset.order_by(
+            *[F(key).desc(nulls_last=True) for key in self.keys]
+        )
+
+    def get_paginated_response(self, data):
+        if not self.paginated:
+            return Response(data)
+        return Response({"results": data, "next_cursor": self.next_cursor})
+
+    def get_limit(self, limit):
+        if limit is None:
+            return self.default_limit
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError("limit must be an integer")
+        if limit < 1:
+            raise ValidationError("limit must be positive")
+        return min(limit, self.max_limit)
+
+    def filter_updated_since(self, queryset, updated_since):
+        if not updated_since:
+            return queryset
+        # Well formed but impossible values (month 13) raise ValueError
+        try:
+            since = parse_datetime(updated_since)
+            day = parse_date(updated_since) if since is None else None
+        except ValueError:
+            since = day = None
+        if since is None:
+            if day is None:
+                raise ValidationError("updated_since must be a date or datetime")
+            since = datetime.combine(day, time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+        field = queryset.model._meta.get_field(self.updated_field)
+        if not isinstance(field, models.DateTimeField):
+            since = since.date()
+        return queryset.filter(**{f"{self.updated_field}__gte": since})
+
+    def after(self, model, values):
+        """
+        Rows strictly after the cursor in descending order, NULLs sorting last
+        """
+        conditions = []
+        equal = Q()
+        for key, value in zip(self.keys, values):
+            if value is not None:
+                later = Q(**{f"{key}__lt": value})
+                if model._meta.get_field(key).null:
+                    later |= Q(**{f"{key}__isnull": True})
+                conditions.append(equal & later)
+                equal &= Q(**{key: value})
+            else:
+                equal &= Q(**{f"{key}__isnull": True})
+        return reduce(operator.or_, conditions) if conditions else None
+
+    def encode_cursor(self, row):
+        values = []
+        for key in self.keys:
+            value = getattr(row, key)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, model, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError
+            return [
+                None if value is None else model._meta.get_field(key).to_python(value)
+                for key, value in zip(self.keys, values)
+            ]
+        except Exception:
+            raise ValidationError("Invalid cursor")
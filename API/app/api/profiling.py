@@ -0,0 +1,235 @@
+"""
+Profiling of single requests and continuous sampling, see ProfilingMiddleware
+
+A request carrying a token from `manage.py profile_token` (X-Profile header or
+profile query parameter) runs under cProfile. Its call tree and the timeline
+of its SQL queries are written to PROFILE_DIR, and returned in place of the
+response with profile_output=inline. Tokens are signed with SECRET_KEY and
+expire after PROFILE_TOKEN_MAX_AGE seconds, so only whoever can run commands
+on the server can hand them out.
+
+With PROFILE_SAMPLING a thread of each worker takes the stacks of the threads
+serving a request every PROFILE_SAMPLE_INTERVAL_MS and adds them, per route,
+to stacks_<pid>.txt in PROFILE_DIR in the collapsed format of flamegraph.pl
+and speedscope.
+"""
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from api.timing import SQL_LOG_LENGTH, call_site
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+TOKEN_SALT = "api.profiling"
+TREE_SIZE = 40
+CALLEES = 10
+
+
+def profile_token(issued_to):
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(issued_to)
+
+
+def check_token(token):
+    """
+    Name the token was issued to, None when it is forged or expired
+    """
+    try:
+        return signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+
+
+class SqlTimeline:
+    """
+    Execute wrapper recording when each query started, relative to the
+    request, and how long it ran
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "database": context["connection"].alias,
+                "sql": sql[:SQL_LOG_LENGTH],
+                "call_site": call_site([__file__]),
+            })
+
+
+def function_name(function):
+    filename, line, name = function
+    root = str(settings.BASE_DIR) + "/"
+    if filename.startswith(root):
+        filename = filename.removeprefix(root)
+    elif filename == "~":
+        # Built-in functions, e.g. <method 'execute' of 'sqlite3.Cursor' objects>
+        return name
+    return f"{filename}:{line}({name})"
+
+
+def call_tree(profile, size=TREE_SIZE):
+    """
+    The size functions with the most cumulative time, each with the functions
+    it called most
+    """
+    entries = pstats.Stats(profile).stats
+    callees = defaultdict(list)
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (calls, _, _, cumulative) in callers.items():
+            callees[caller].append((cumulative, calls, function))
+    tree = []
+    for function, (_, calls, own, cumulative, _) in sorted(
+        entries.items(), key=lambda entry: entry[1][3], reverse=True
+    )[:size]:
+        tree.append({
+            "function": function_name(function),
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+            "callees": [
+                {
+                    "function": function_name(callee),
+                    "calls": callee_calls,
+                    "cumulative_ms": round(callee_cumulative * 1000, 3),
+                }
+                for callee_cumulative, callee_calls, callee in sorted(
+                    callees[function], key=lambda callee: callee[0], reverse=True
+                )[:CALLEES]
+            ],
+        })
+    return tree
+
+
+@contextmanager
+def profile_request():
+    """
+    Run the block under cProfile and record the SQL of every connection
+    """
+    started = time.perf_counter()
+    timeline = SqlTimeline(started)
+    profile = cProfile.Profile()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timeline))
+        profile.enable()
+        try:
+            yield profile, timeline
+        finally:
+            profile.disable()
+            timeline.total_ms = round((time.perf_counter() - started) * 1000, 3)
+
+
+def save_profile(report, profile):
+    """
+    Write the report as JSON and the raw stats as .prof (for snakeviz or
+    pstats) to PROFILE_DIR, return the report's file name
+    """
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    route = (report["route"] or "unmatched").replace("/", "_").strip("_")
+    stem = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}_{os.getpid()}_{route}"
+    profile.dump_stats(directory / f"{stem}.prof")
+    with open(directory / f"{stem}.json", "w") as output:
+        json.dump(report, output, indent=2)
+    return f"{stem}.json"
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}"
+
+
+class Sampler:
+    """
+    Stacks of the threads serving a request taken every interval seconds and
+    counted per route, written to the process' stacks file every flush_every
+    seconds
+    """
+
+    def __init__(self, directory, interval, flush_every):
+        self.path = Path(directory) / f"stacks_{os.getpid()}.txt"
+        self.interval = interval
+        self.flush_every = flush_every
+        self.active = {}
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="profile-sampler", daemon=True)
+
+    def start(self, route):
+        self.active[threading.get_ident()] = route
+
+    def stop(self):
+        self.active.pop(threading.get_ident(), None)
+
+    def run(self):
+        flushed = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+            if time.monotonic() - flushed >= self.flush_every:
+                self.flush()
+                flushed = time.monotonic()
+
+    def sample(self):
+        frames = sys._current_frames()
+        for ident, route in list(self.active.items()):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            with self.lock:
+                self.counts[";".join([route, *reversed(stack)])] += 1
+
+    def flush(self):
+        with self.lock:
+            lines = [f"{stack} {count}\n" for stack, count in sorted(self.counts.items())]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Replaced whole so readers never see half a file
+        partial = self.path.with_suffix(".tmp")
+        partial.write_text("".join(lines))
+        partial.replace(self.path)
+
+
+_sampler = None
+_sampler_pid = None
+_sampler_lock = threading.Lock()
+
+
+def sampler():
+    """
+    Sampler of the current process, started on first use after a fork
+    """
+    global _sampler, _sampler_pid
+    pid = os.getpid()
+    if _sampler_pid != pid:
+        with _sampler_lock:
+            if _sampler_pid != pid:
+                _sampler = Sampler(
+                    settings.PROFILE_DIR,
+                    settings.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+                    settings.PROFILE_FLUSH_SECONDS,
+                )
+                _sampler.thread.start()
+                _sampler_pid = pid
+    return _sampler
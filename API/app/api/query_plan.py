@@ -0,0 +1,54 @@
+"""
+SQLite query plans of executed queries, used by the tests to check that the
+hot queries are served by their indexes
+
+query_budgets.json lists the hot endpoints with their query budget and the
+tables that must never be scanned in full (see api.tests.QueryBudgetTests)
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from pathlib import Path
+import json
+import re
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+SCAN = re.compile(r"SCAN (\w+)")
+SUBQUERY_ALIAS = re.compile(r"U\d+")
+
+
+def query_plan(sql, using=DEFAULT_DB_ALIAS):
+    """
+    Return the EXPLAIN QUERY PLAN detail lines of an SQLite SELECT
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def captured_plans(captured_queries, using=DEFAULT_DB_ALIAS):
+    """
+    Return the query plans of the SELECTs recorded by CaptureQueriesContext,
+    whose SQL has its parameters inlined
+    """
+    return [
+        query_plan(query["sql"], using)
+        for query in captured_queries
+        if query["sql"].lstrip().upper().startswith("SELECT")
+    ]
+
+
+def table_scans(lines, tables):
+    """
+    Return the plan lines reading one of the tables in full, including
+    through the U0, U1 .. aliases Django gives subquery tables
+    """
+    scans = []
+    for line in lines:
+        match = SCAN.match(line)
+        if match and (match.group(1) in tables or SUBQUERY_ALIAS.fullmatch(match.group(1))):
+            scans.append(line)
+    return scans
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path) as manifest:
+        return json.load(manifest)
@@ -0,0 +1,106 @@
+from rest_framework import serializers
+from django.db.models.signals import post_delete, post_save
+from collections import namedtuple
+import hashlib
+import threading
+
+
+def code_order(row):
+    code = str(row[0])
+    return (0, int(code), code) if code.isdigit() and str(int(code)) == code else (1, 0, code)
+
+
+class ReferenceRegistry:
+    """
+    Immutable in-process copy of a small reference table keyed by its codes,
+    e.g. the 114 surahs or the 60 hizbs.
+
+    Rows are read once per process on first use and reloaded only after the
+    table is written to (loaddata of the fixtures sends post_save as well).
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.entry = namedtuple(f"{model.__name__}Entry", fields)
+        self._lock = threading.Lock()
+        self._entries = None
+        self._etag = None
+        post_save.connect(self._invalidate, sender=model, weak=False)
+        post_delete.connect(self._invalidate, sender=model, weak=False)
+
+    def __deepcopy__(self, memo):
+        # Shared by the serializer fields that get deep-copied per instance
+        return self
+
+    def _invalidate(self, **kwargs):
+        self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+            self._etag = None
+
+    def _load(self):
+        with self._lock:
+            if self._entries is None:
+                rows = list(self.model.objects.values_list(*self.fields))
+                # Keyed by the stored code as text, numeric codes in their order
+                rows.sort(key=code_order)
+                self._entries = {str(row[0]): self.entry(*row) for row in rows}
+                self._etag = hashlib.sha1(repr(rows).encode()).hexdigest()
+            return self._entries
+
+    @property
+    def entries(self):
+        entries = self._entries
+        if entries is None:
+            entries = self._load()
+        return entries
+
+    @property
+    def etag(self):
+        self.entries
+        return self._etag
+
+    def all(self):
+        return list(self.entries.values())
+
+    def get(self, code):
+        """
+        Return the entry for code (int or string, matching the stored code
+        exactly), or None
+        """
+        if code is None or isinstance(code, bool):
+            return None
+        return self.entries.get(str(code))
+
+    def get_instance(self, code):
+        """
+        Return a model instance built from the entry, as if loaded from the
+        database, suitable for assigning to a foreign key without a query
+        """
+        entry = self.get(code)
+        if entry is None:
+            return None
+        return self.model.from_db(None, list(self.fields), list(entry))
+
+
+class ReferenceField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key related field validated against a ReferenceRegistry instead of
+    a database lookup
+    """
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        kwargs.setdefault("queryset", registry.model.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = self.registry.get_instance(data)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
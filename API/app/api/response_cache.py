@@ -0,0 +1,159 @@
+"""
+Cache of read endpoint responses per doctor, on the default Django cache
+
+Entries are keyed by the doctor's data version, a token replaced after every
+committed write to the doctor's students and their rows, so a write makes all
+of the doctor's cached responses unreachable at once. With several workers the
+cache backend must be shared (file-based, memcached) for the versions to be.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.views.decorators.http import condition
+from rest_framework.response import Response
+from att.models import Attendance
+from chap.models import CompletedChapter
+from eig.models import CompletedQuarter
+from pay.models import Payment
+from stu.models import Student
+from .models import Doctor
+from .sharding import current_shard
+from . import metrics
+from functools import wraps
+import hashlib
+import uuid
+
+
+def version_key(doctor_code):
+    return f"doctor-version:{doctor_code}"
+
+
+def data_version(doctor_code):
+    """
+    Return the doctor's current data version, starting a new one when the
+    cache has none (first use or evicted)
+    """
+    key = version_key(doctor_code)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def new_version(doctor_code):
+    cache.set(version_key(doctor_code), uuid.uuid4().hex, None)
+
+
+def bump_version(doctor_code, using=None):
+    """
+    Replace the doctor's data version now, for reads in the writing
+    transaction, and again once it commits, so a concurrent reader cannot
+    keep data older than the commit under the new version
+    """
+    new_version(doctor_code)
+    transaction.on_commit(
+        lambda: new_version(doctor_code), using=using or current_shard()
+    )
+
+
+def query_digest(request):
+    query = sorted(request.query_params.lists())
+    return hashlib.md5(repr(query).encode()).hexdigest()
+
+
+def response_key(name, request):
+    # Missing date params default to today
+    today = timezone.localdate().isoformat()
+    return f"response:{name}:{request.code}:{data_version(request.code)}:{today}:{query_digest(request)}"
+
+
+def doctor_condition(name):
+    """
+    condition() for a doctor-wide report, tagged with the doctor's data
+    version so a matching If-None-Match gets 304 before the view runs
+    """
+
+    def etag_func(request, *args, **kwargs):
+        today = timezone.localdate().isoformat()
+        return f'"{name}.{request.code}.{data_version(request.code)}.{today}.{query_digest(request)}"'
+
+    return condition(etag_func=etag_func)
+
+
+def cached_response(name):
+    """
+    Serve the authenticated doctor's successful responses of the view from the
+    cache until the doctor's data changes or RESPONSE_CACHE_TIMEOUT passes
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            # Profiled requests always run the view (see api.middleware.profiling)
+            if not settings.RESPONSE_CACHE_TIMEOUT or getattr(request, "profiling", False):
+                return func(request, *args, **kwargs)
+            key = response_key(name, request)
+            data = cache.get(key)
+            if data is not None:
+                metrics.cache_requests.inc("response", "hit")
+                return Response(data)
+            metrics.cache_requests.inc("response", "miss")
+            response = func(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def doctor_of(instance):
+    """
+    Code of the doctor owning a student or one of its rows
+    """
+    if isinstance(instance, (Student, Payment)):
+        return instance.doctor_id
+    if type(instance).student.is_cached(instance):
+        return instance.student.doctor_id
+    return (
+        Student.objects.filter(code=instance.student_id)
+        .values_list("doctor_id", flat=True)
+        .first()
+    )
+
+
+def is_cascade(origin):
+    """
+    Whether a delete started from a student or a doctor, whose students'
+    own signals already bump the version
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, (Student, Doctor))
+
+
+def invalidate_doctor_responses(sender, instance, using, origin=None, **kwargs):
+    if sender is Doctor:
+        # New doctors start from a fresh version, codes reused by tests included
+        if kwargs.get("created"):
+            new_version(instance.code)
+        return
+    if sender is not Student and origin is not None and is_cascade(origin):
+        return
+    doctor_code = doctor_of(instance)
+    if doctor_code:
+        bump_version(doctor_code, using)
+
+
+post_save.connect(invalidate_doctor_responses, sender=Doctor, dispatch_uid="responses_save_Doctor")
+for model in (Student, Attendance, Payment, CompletedChapter, CompletedQuarter):
+    post_save.connect(
+        invalidate_doctor_responses, sender=model, dispatch_uid=f"responses_save_{model.__name__}"
+    )
+    post_delete.connect(
+        invalidate_doctor_responses, sender=model, dispatch_uid=f"responses_delete_{model.__name__}"
+    )
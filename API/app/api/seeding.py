@@ -0,0 +1,267 @@
+"""
+Deterministic synthetic circles for local load reproduction and benchmarks
+
+Each doctor meets their circle on a few fixed weekdays. Students attend at
+their own rate and on a present day have a memorization and/or a review
+session: chapter students walk the surahs from An-Nas backwards in verse
+chunks bounded by chap/initial_data.json, eighth students walk the hizbs
+from the 60th backwards one eighth at a time. Payments are monthly.
+
+Every doctor and student draws from its own random.Random seeded from the
+run's seed and its index, so a seed always yields the same rows whatever the
+batch size (codes aside, which come from the code sequences). Rows are
+streamed to bulk_create in batches, one transaction per doctor, so memory
+stays bounded by the batch size and no signals run per row; the students'
+StudentStats are rebuilt once per doctor.
+"""
+from django.conf import settings
+from django.db import transaction
+from datetime import timedelta
+from decimal import Decimal
+from att.models import Attendance
+from chap.models import CompletedChapter
+from eig.models import CompletedQuarter
+from pay.models import Payment
+from stu.models import Student
+from stu.statistics import rebuild_stats
+from .models import Doctor
+from .sharding import shard_for_doctor, use_shard
+import json
+import random
+
+SURAHS_PATH = settings.BASE_DIR / "chap" / "initial_data.json"
+HIZBS = 60
+EIGHTHS = 8
+BATCH_SIZE = 2000
+SEEDED_PASSWORD = "!seeded"
+
+FIRST_NAMES = {
+    "M": ["Ahmed", "Mohamed", "Youssef", "Omar", "Ali", "Hamza", "Ibrahim", "Khalid",
+          "Bilal", "Anas", "Zakaria", "Ismail", "Yassine", "Amine", "Adam", "Idris",
+          "Ayoub", "Hassan", "Hussein", "Mustafa"],
+    "F": ["Fatima", "Aisha", "Khadija", "Maryam", "Zainab", "Salma", "Asmaa", "Hafsa",
+          "Sara", "Amina", "Nour", "Hiba", "Imane", "Safaa", "Rania", "Houda",
+          "Malak", "Yasmine", "Ikram", "Sumaya"],
+}
+LAST_NAMES = [
+    "Alaoui", "Benali", "Bennani", "Chraibi", "El Amrani", "El Idrissi", "Fassi",
+    "Haddad", "Kettani", "Lahlou", "Mansouri", "Naciri", "Ouazzani", "Qadiri",
+    "Rahmani", "Saidi", "Tazi", "Wahbi", "Yacoubi", "Zerouali",
+]
+
+
+def surah_verses(path=SURAHS_PATH):
+    """
+    Number of verses of each surah code, from the reference fixture
+    """
+    with open(path) as fixture:
+        return {row["fields"]["code"]: row["fields"]["number_of_verses"] for row in json.load(fixture)}
+
+
+class CircleSeeder:
+    """
+    Generate and insert the rows of synthetic circles between start and end
+    counts holds the number of inserted rows per model name
+    """
+
+    def __init__(self, seed, start, end, batch_size=BATCH_SIZE, eighth_share=0.4):
+        self.seed = seed
+        self.start = start
+        self.end = end
+        self.batch_size = batch_size
+        self.eighth_share = eighth_share
+        self.verses = surah_verses()
+        self.counts = dict.fromkeys(
+            ["Doctor", "Student", "Attendance", "CompletedChapter", "CompletedQuarter", "Payment"], 0
+        )
+        self.pending = {}
+
+    def seed_doctor(self, index, students):
+        """
+        Create the index-th doctor of the run with their circle of students
+        Returns the doctor and the students
+        """
+        rng = random.Random(f"{self.seed}:{index}")
+        first_name = rng.choice(FIRST_NAMES["M"])
+        last_name = rng.choice(LAST_NAMES)
+        doctor = Doctor.objects.create(
+            first_name=first_name,
+            last_name=last_name,
+            email=f"{first_name}.{index}.seed{self.seed}@circles.test".lower(),
+            phone_number=f"06{rng.randrange(10 ** 8):08d}",
+            password=SEEDED_PASSWORD,
+            verified=True,
+        )
+        self.counts["Doctor"] += 1
+        alias = shard_for_doctor(doctor) if settings.SHARD_COUNT else None
+        with use_shard(alias), transaction.atomic(using=alias):
+            circle = {
+                "weekdays": sorted(rng.sample(range(7), rng.randint(3, 5))),
+                "fee": Decimal(rng.choice([50, 80, 100, 150, 200])),
+            }
+            rows = Student.objects.bulk_create(self.students(rng, doctor, students))
+            self.counts["Student"] += len(rows)
+            for number, student in enumerate(rows):
+                student_rng = random.Random(f"{self.seed}:{index}:{number}")
+                for row in self.student_rows(student_rng, student, circle):
+                    self.add(row)
+            self.flush()
+            rebuild_stats([student.code for student in rows])
+        return doctor, rows
+
+    def students(self, rng, doctor, count):
+        eighths = set(rng.sample(range(count), round(count * self.eighth_share)))
+        pairs = len(FIRST_NAMES["M"]) * len(LAST_NAMES)
+        picks = rng.sample(range(pairs), min(count, pairs))
+        for number in range(count):
+            gender = rng.choice("MF")
+            family, first = divmod(picks[number % pairs], len(FIRST_NAMES["M"]))
+            # Past the distinct name pairs, a suffix keeps (first, last, doctor) unique
+            suffix = f" {number // pairs + 1}" if number >= pairs else ""
+            yield Student(
+                doctor=doctor,
+                first_name=FIRST_NAMES[gender][first],
+                last_name=LAST_NAMES[family] + suffix,
+                parent=f"{rng.choice(FIRST_NAMES['M'])} {LAST_NAMES[family]}",
+                phone_number=f"06{rng.randrange(10 ** 8):08d}",
+                date_of_registration=self.start - timedelta(days=rng.randrange(365)),
+                gender=gender,
+                age=rng.randint(6, 16),
+                memorization_method="eighth" if number in eighths else "chapter",
+            )
+
+    def student_rows(self, rng, student, circle):
+        """
+        Yield the student's attendance, sessions and payments in date order
+        """
+        attendance_rate = rng.uniform(0.6, 0.98)
+        sessions = self.chapter_sessions if student.memorization_method == "chapter" else self.quarter_sessions
+        progress = sessions(rng, student)
+        next(progress)
+        day = self.start
+        while day <= self.end:
+            if day.weekday() in circle["weekdays"]:
+                present = rng.random() < attendance_rate
+                yield Attendance(
+                    student=student,
+                    attendance_date=day,
+                    state="present" if present else "absent",
+                )
+                if present:
+                    yield from progress.send(day)
+            if day.day == 1 and rng.random() < 0.9:
+                yield Payment(
+                    student=student,
+                    doctor_id=student.doctor_id,
+                    year=day.year,
+                    month=day.month,
+                    amount=circle["fee"],
+                )
+            day += timedelta(days=1)
+
+    def session_kinds(self, rng):
+        memorization = rng.random() < 0.7
+        review = not memorization or rng.random() < 0.4
+        return [kind for kind, held in (("memorization", memorization), ("review", review)) if held]
+
+    def chapter_sessions(self, rng, student):
+        """
+        Coroutine receiving present days and returning their CompletedChapter rows
+        """
+        surah, verse = 114, 1
+        rows = []
+        while True:
+            day = yield rows
+            rows = []
+            for kind in self.session_kinds(rng):
+                if kind == "memorization":
+                    verses = self.verses[surah]
+                    verse_to = min(verses, verse + rng.randint(2, 9))
+                    completed = verse_to == verses
+                    next_surah, next_verse = (surah - 1 or 114, 1) if completed else (surah, verse_to + 1)
+                    rows.append(CompletedChapter(
+                        student=student,
+                        chapter_id=surah,
+                        surah_id=surah,
+                        verse_from=verse,
+                        verse_to=verse_to,
+                        is_surah_completed=completed,
+                        session_type=kind,
+                        completion_date=day,
+                        rating=rng.choices(range(1, 6), weights=[1, 2, 4, 5, 3])[0],
+                        next_surah_id=next_surah,
+                        next_verse_from=next_verse,
+                        next_verse_to=min(self.verses[next_surah], next_verse + 5),
+                    ))
+                    surah, verse = next_surah, next_verse
+                else:
+                    reviewed = rng.randint(surah, 114)
+                    rows.append(CompletedChapter(
+                        student=student,
+                        chapter_id=reviewed,
+                        surah_id=reviewed,
+                        verse_from=1,
+                        verse_to=self.verses[reviewed],
+                        is_surah_completed=True,
+                        session_type=kind,
+                        completion_date=day,
+                        rating=rng.choices(range(1, 6), weights=[1, 1, 3, 5, 4])[0],
+                        next_surah_id=rng.randint(surah, 114),
+                    ))
+
+    def quarter_sessions(self, rng, student):
+        """
+        Coroutine receiving present days and returning their CompletedQuarter rows
+        """
+        hizb, eighth = HIZBS, 1
+        rows = []
+        while True:
+            day = yield rows
+            rows = []
+            for kind in self.session_kinds(rng):
+                if kind == "memorization":
+                    completed = eighth == EIGHTHS
+                    next_hizb, next_eighth = (hizb - 1 or HIZBS, 1) if completed else (hizb, eighth + 1)
+                    rows.append(CompletedQuarter(
+                        student=student,
+                        quarter_id=hizb,
+                        hizb_number=hizb,
+                        eighth_number=eighth,
+                        is_hizb_completed=completed,
+                        session_type=kind,
+                        completion_date=day,
+                        rating=rng.choices(range(1, 6), weights=[1, 2, 4, 5, 3])[0],
+                        next_hizb_number=next_hizb,
+                        next_eighth_number=next_eighth,
+                    ))
+                    hizb, eighth = next_hizb, next_eighth
+                else:
+                    reviewed = rng.randint(hizb, HIZBS)
+                    rows.append(CompletedQuarter(
+                        student=student,
+                        quarter_id=reviewed,
+                        hizb_number=reviewed,
+                        eighth_number=rng.randint(1, EIGHTHS),
+                        session_type=kind,
+                        completion_date=day,
+                        rating=rng.choices(range(1, 6), weights=[1, 1, 3, 5, 4])[0],
+                        next_hizb_number=rng.randint(hizb, HIZBS),
+                        next_eighth_number=rng.randint(1, EIGHTHS),
+                    ))
+
+    def add(self, row):
+        model = type(row)
+        batch = self.pending.setdefault(model, [])
+        batch.append(row)
+        if len(batch) >= self.batch_size:
+            self.write(model)
+
+    def flush(self):
+        for model in list(self.pending):
+            self.write(model)
+
+    def write(self, model):
+        batch = self.pending.pop(model, [])
+        if batch:
+            model.objects.bulk_create(batch)
+            self.counts[model.__name__] += len(batch)
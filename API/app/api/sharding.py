@@ -0,0 +1,163 @@
+"""
+Per-doctor SQLite shards
+
+With SHARD_COUNT > 0 every doctor's students and the rows that hang off them
+(statistics, attendance, completions, payments) live in one of the shard
+databases shard_0 .. shard_{n-1}, so writes of different circles take
+different file locks. Doctors and the reference tables stay in the default
+database; each shard keeps a copy of its doctors' rows and of the reference
+tables so its foreign keys and joins resolve locally.
+
+The shard of a request is selected by ShardMiddleware from the authenticated
+doctor, or from the student code of the student portal routes.
+
+Each shard hands out auto-increment ids from its own range, so the ids seen
+by clients (attendance, completions) stay unique when rebalance_shards moves
+rows to another shard.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.db.models.signals import post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from django.conf import settings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .models import Doctor
+
+SHARDED_APPS = {"stu", "att", "chap", "eig", "pay"}
+# Reference tables of the sharded apps, read from the default database
+REFERENCE_MODELS = {"chap.chapter", "eig.quarter"}
+
+# Ids of shard_i start above (i + 1) * SHARD_ID_RANGE, under 2**53 for clients
+SHARD_ID_RANGE = 10**12
+
+_current_shard = ContextVar("current_shard", default=None)
+
+
+class ShardNotSelected(RuntimeError):
+    pass
+
+
+def shard_aliases():
+    return [f"shard_{index}" for index in range(settings.SHARD_COUNT)]
+
+
+def is_sharded(model):
+    return (
+        model._meta.app_label in SHARDED_APPS
+        and model._meta.label_lower not in REFERENCE_MODELS
+    )
+
+
+def shard_for_doctor(doctor):
+    """
+    Alias of the doctor's shard: the assigned one, else placed by code
+    """
+    index = doctor.shard if doctor.shard is not None else int(doctor.code) % settings.SHARD_COUNT
+    return f"shard_{index}"
+
+
+def current_shard():
+    return _current_shard.get()
+
+
+@contextmanager
+def use_shard(alias):
+    token = _current_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+def locate_student(student_code):
+    """
+    Alias of the shard holding the student, or None
+    """
+    from stu.models import Student
+
+    for alias in shard_aliases():
+        if Student.objects.using(alias).filter(code=student_code).exists():
+            return alias
+    return None
+
+
+class DoctorShardRouter:
+    """
+    Send sharded models to the selected shard and everything else to the
+    default database; every database gets the full schema
+    """
+
+    def _db(self, model, instance=None, **hints):
+        if not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+        # Related doctors come from the default database, not the shard
+        if instance is not None and is_sharded(instance) and instance._state.db:
+            return instance._state.db
+        alias = current_shard()
+        if alias is None:
+            raise ShardNotSelected(f"No shard selected for {model._meta.label}")
+        return alias
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Doctors and reference rows are mirrored into every shard
+        return True
+
+
+@receiver(post_save, sender=Doctor)
+def mirror_doctor(sender, instance, using, **kwargs):
+    """
+    Copy a doctor saved in the default database into its shard
+    """
+    if not settings.SHARD_COUNT or using != DEFAULT_DB_ALIAS:
+        return
+    fields = [field.attname for field in Doctor._meta.concrete_fields]
+    mirror = Doctor(**{name: getattr(instance, name) for name in fields})
+    Doctor.objects.using(shard_for_doctor(instance)).bulk_create(
+        [mirror],
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=[name for name in fields if name != "code"],
+    )
+
+
+@receiver(pre_delete, sender=Doctor)
+def delete_doctor_shard_rows(sender, instance, using, **kwargs):
+    """
+    Delete the doctor's students and mirror from its shard before the doctor
+    """
+    if not settings.SHARD_COUNT or using != DEFAULT_DB_ALIAS:
+        return
+    alias = shard_for_doctor(instance)
+    with use_shard(alias):
+        Doctor.objects.using(alias).filter(code=instance.code).delete()
+
+
+@receiver(post_migrate)
+def reserve_shard_ids(sender, app_config, using, **kwargs):
+    """
+    Start the auto-increment sequences of a shard's tables at the shard's id
+    range, leaving sequences already past it alone
+    """
+    if using not in shard_aliases() or app_config.label not in SHARDED_APPS:
+        return
+    start = (int(using.removeprefix("shard_")) + 1) * SHARD_ID_RANGE
+    with connections[using].cursor() as cursor:
+        for model in app_config.get_models():
+            if not is_sharded(model) or not isinstance(model._meta.pk, models.AutoField):
+                continue
+            table = model._meta.db_table
+            cursor.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s "
+                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)",
+                [table, start, table],
+            )
+            cursor.execute(
+                "UPDATE sqlite_sequence SET seq = %s WHERE name = %s AND seq < %s",
+                [start, table, start],
+            )
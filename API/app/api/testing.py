@@ -0,0 +1,52 @@
+"""
+Fixtures shared by the tests of the apps
+"""
+from django.conf import settings
+from django.test import Client, TestCase
+from api.models import Doctor
+from api.utils import encode
+from stu.models import Student
+
+
+def create_doctor(first_name="Test", email="doctor@example.com"):
+    return Doctor.objects.create(
+        first_name=first_name,
+        last_name="Doctor",
+        email=email,
+        password="#78sfsfASff",
+    )
+
+
+def doctor_client(doctor):
+    """
+    Client authenticated as the doctor with a valid access token
+    """
+    client = Client()
+    client.cookies[settings.TOKEN_ACCESS_NAME] = encode(minutes=15, code=str(doctor.code))
+    return client
+
+
+class DoctorTestCase(TestCase):
+    """Base test case with a doctor, an authenticated client and student factory"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = create_doctor()
+
+    def setUp(self):
+        self.client = doctor_client(self.doctor)
+
+    @classmethod
+    def create_student(cls, first_name="Student", doctor=None, **fields):
+        return Student.objects.create(
+            **{
+                "doctor": doctor or cls.doctor,
+                "first_name": first_name,
+                "last_name": "Family",
+                "parent": "Parent",
+                "phone_number": "0600000000",
+                "gender": "M",
+                "age": 10,
+                **fields,
+            }
+        )
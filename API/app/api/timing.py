@@ -0,0 +1,114 @@
+"""
+Per-request timing of SQL and serializers, see TimingMiddleware
+
+A RequestTimer installed for the current request counts the queries of every
+database connection and their time, and the time spent producing serializer
+data (including the queries it triggers). Queries slower than SLOW_QUERY_MS
+are logged with the line of the project code that ran them.
+"""
+from django.conf import settings
+from django.db import connections
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from rest_framework.serializers import BaseSerializer
+import logging
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+_current_timer = ContextVar("current_timer", default=None)
+SQL_LOG_LENGTH = 500
+
+
+def call_site(skip=()):
+    """
+    Innermost frame of the project code outside this module and the skip
+    files, as path:line
+    """
+    root = str(settings.BASE_DIR)
+    skip = {__file__, *skip}
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(root) and frame.filename not in skip:
+            return f"{frame.filename.removeprefix(root + '/')}:{frame.lineno}"
+    return None
+
+
+class SqlTimer:
+    """
+    Execute wrapper counting the queries of a connection and their time,
+    logging those slower than slow_ms when it is set
+    """
+
+    def __init__(self, slow_ms=None):
+        self.count = 0
+        self.seconds = 0.0
+        self.slow_ms = slow_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.seconds += elapsed
+            self.count += 1
+            if self.slow_ms is not None and elapsed * 1000 >= self.slow_ms:
+                logger.warning(
+                    "Slow query %.1f ms on %s at %s: %s",
+                    elapsed * 1000,
+                    context["connection"].alias,
+                    call_site(),
+                    sql[:SQL_LOG_LENGTH],
+                )
+
+
+class RequestTimer:
+    def __init__(self, slow_ms=None):
+        self.sql = SqlTimer(slow_ms)
+        self.serialize_seconds = 0.0
+        self.serializing = False
+
+
+@contextmanager
+def time_request(slow_ms=None):
+    """
+    Time the SQL of every connection and the serializers inside the block
+    """
+    timer = RequestTimer(slow_ms)
+    token = _current_timer.set(timer)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer.sql))
+            yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+def timed_data(data):
+    """
+    Wrap the BaseSerializer.data property to add its time to the current
+    request's timer, once for nested serializers
+    Serializers used outside a timed request only pay for the lookup
+    """
+
+    def wrapper(serializer):
+        timer = _current_timer.get()
+        if timer is None or timer.serializing:
+            return data.fget(serializer)
+        timer.serializing = True
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            timer.serialize_seconds += time.perf_counter() - started
+            timer.serializing = False
+
+    wrapper.timed = True
+    return property(wrapper)
+
+
+def instrument_serializers():
+    if not getattr(BaseSerializer.data.fget, "timed", False):
+        BaseSerializer.data = timed_data(BaseSerializer.data)
@@ -0,0 +1,52 @@
+"""
+Write transactions that tolerate SQLite lock contention between workers
+"""
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+from django.conf import settings
+from functools import wraps
+from .sharding import current_shard
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def is_locked(error):
+    return "database is locked" in str(error) or "database table is locked" in str(error)
+
+
+def write_transaction(func):
+    """
+    Run func in one transaction, opened with BEGIN IMMEDIATE under the SQLite
+    production profile, and run it again with bounded exponential backoff
+    when the database stays locked past busy_timeout
+    Inside an outer transaction func just joins it, as a retry would replay
+    only part of the outer work
+    The transaction is opened on the shard selected for the request, if any
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        using = current_shard() or DEFAULT_DB_ALIAS
+        if transaction.get_connection(using).in_atomic_block:
+            return func(*args, **kwargs)
+        retries = settings.DB_WRITE_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == retries or not is_locked(error):
+                    raise
+                delay = min(
+                    settings.DB_WRITE_RETRY_MAX_DELAY,
+                    settings.DB_WRITE_RETRY_DELAY * 2**attempt,
+                )
+                logger.warning(
+                    "Database locked in %s, retry %d/%d in %.2fs",
+                    func.__qualname__, attempt + 1, retries, delay,
+                )
+                time.sleep(random.uniform(delay / 2, delay))
+
+    return wrapper
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from . import views
-from att.views import get_all_students_attendance_view
+from att.views import get_all_students_attendance_view, bulk_attendance_view
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -15,6 +15,7 @@ urlpatterns = [
     path("redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
     # API Endpoints List
     path("endpoints", views.list_endpoints, name="list_endpoints"),
+    path("metrics", views.metrics_view, name="metrics"),
     # Authentication and User Management
     path("me", views.get_me_view.as_view(), name="get_me"),
     path("login", views.login_view.as_view(), name="login"),
@@ -25,6 +26,7 @@ urlpatterns = [
     path("student/", include("stu.url"), name="students"),
     path("attendance/<int:student>/", include("att.urls"), name="attendance"),
     path("attendance/all", get_all_students_attendance_view.as_view(), name="all_attendance"),
+    path("attendance/bulk", bulk_attendance_view.as_view(), name="bulk_attendance"),
     path("chapters/<int:student>/", include("chap.urls"), name="chapters"),
     path("quarters/<int:student>/", include("eig.urls"), name="quarters"),
     path("payments/", include("pay.urls"), name="payments"),
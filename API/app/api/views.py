@@ -1,6 +1,7 @@
 from .utils import send_verification_email, generate_user_tokens, encode
 from rest_framework.exceptions import ValidationError, NotAuthenticated
 from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from rest_framework.response import Response
 from django.http import HttpResponse
 from django.urls import get_resolver
@@ -9,6 +10,10 @@ from django.conf import settings
 from http import HTTPStatus
 from functools import wraps
 from .models import Doctor
+from .doctor_cache import get_doctor
+from . import metrics
+import hmac
+import logging
 import re
 from .serializers import (
     code_serializer,
@@ -18,6 +23,8 @@ from .serializers import (
     login_serializer,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def list_endpoints(request):
     """
@@ -81,16 +88,42 @@ def list_endpoints(request):
     return HttpResponse(html)
 
 
+def metrics_view(request):
+    """
+    Prometheus metrics of all workers, in the text exposition format
+    With METRICS_TOKEN set, scrapers must send it as a bearer token
+    """
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return HttpResponse(status=HTTPStatus.FORBIDDEN)
+    return HttpResponse(
+        metrics.metrics_text(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def load_doctor(doctor_code):
+    doctor = get_doctor(doctor_code)
+    if not doctor:
+        metrics.auth_failures.inc("unknown_doctor")
+        raise NotAuthenticated("User not found")
+    return doctor
+
+
 def authentication_decorator(func):
+    """
+    Require a valid access token and attach request.doctor, resolved lazily
+    (through the per-worker Doctor cache) only when the view uses it
+    """
+
     @wraps(func)
     def wrapper(request, *args, **kwargs):
         doctor_code = getattr(request, "code", None)
         if not doctor_code:
+            # The middleware records why a token was rejected
+            metrics.auth_failures.inc(getattr(request, "auth_failure", None) or "missing")
             raise NotAuthenticated("Authentication credentials were not provided.")
-        doctor = Doctor.objects.filter(code=doctor_code).first()
-        if not doctor:
-            raise NotAuthenticated("User not found")
-        request.doctor = doctor
+        request.doctor = SimpleLazyObject(lambda: load_doctor(doctor_code))
         return func(request, *args, **kwargs)
 
     return wrapper
@@ -159,10 +192,10 @@ class login_view(generics.GenericAPIView):
         access_cookie_dict = tokens_result[3]
         refresh_cookie_dict = tokens_result[4]
         
-        # Debug: Print cookies being set
-        print(f"🔐 Login successful for code: {code}")
-        print(f"🍪 Setting _access cookie with SameSite={access_cookie_dict.get('samesite')}")
-        print(f"🍪 Setting _refresh cookie with SameSite={refresh_cookie_dict.get('samesite')}")
+        logger.info("Login successful for code %s", code)
+        logger.debug(
+            "Setting auth cookies with SameSite=%s", access_cookie_dict.get("samesite")
+        )
         
         user_serializer = get_me_serializer(user)
         user_data = user_serializer.data
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('att', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -9,6 +9,7 @@ class Attendance(models.Model):
         max_length=20,
         choices=[("present", "Present"), ("absent", "Absent")],
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Attendance {self.code} for {self.student.name} on {self.attendance_date}, State: {self.state}"
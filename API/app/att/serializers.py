@@ -16,3 +16,14 @@ class attendance_serializer(serializers.ModelSerializer):
 
 class date_serializer(serializers.Serializer):
     date = serializers.DateField()
+
+
+class bulk_attendance_serializer(serializers.Serializer):
+    student = serializers.CharField(max_length=12)
+    date = serializers.DateField()
+    state = serializers.ChoiceField(choices=Attendance._meta.get_field("state").choices)
+
+    def validate_date(self, value):
+        if value > date.today():
+            raise serializers.ValidationError("Date cannot be in the future.")
+        return value
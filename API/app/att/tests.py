@@ -0,0 +1,248 @@
+"""
+Tests for the attendance endpoints
+"""
+
+import json
+from datetime import date, timedelta
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.testing import DoctorTestCase, create_doctor
+from att.models import Attendance
+from stu.models import Student
+
+
+class AttendanceTestCase(DoctorTestCase):
+    """Base test case adding a second doctor whose students must stay hidden"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_doctor = create_doctor("Other", "other@example.com")
+
+
+class AllStudentsAttendanceViewTests(AttendanceTestCase):
+    """Test cases for GET /api/v1/attendance/all"""
+
+    url = "/api/v1/attendance/all"
+
+    def test_all_attendance_for_date_returns_state_per_student(self):
+        """Verify each student is listed with the day's state or None"""
+        ahmed = self.create_student("Ahmed")
+        self.create_student("Bilal")
+        Attendance.objects.create(
+            student=ahmed, attendance_date=date(2024, 3, 4), state="present"
+        )
+        Attendance.objects.create(
+            student=ahmed, attendance_date=date(2024, 3, 5), state="absent"
+        )
+
+        response = self.client.get(self.url, {"date": "2024-03-04"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content),
+            [
+                {
+                    "code": str(ahmed.code),
+                    "name": "Ahmed Family",
+                    "status": "present",
+                    "date": "2024-03-04",
+                },
+                {
+                    "code": Student.objects.get(first_name="Bilal").code,
+                    "name": "Bilal Family",
+                    "status": None,
+                    "date": "2024-03-04",
+                },
+            ],
+        )
+
+    def test_all_attendance_excludes_other_doctors(self):
+        """Verify students of other doctors are not returned"""
+        self.create_student("Ahmed")
+        self.create_student("Zaid", doctor=self.other_doctor)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            [row["name"] for row in json.loads(response.content)], ["Ahmed Family"]
+        )
+
+    def test_all_attendance_with_invalid_date_returns_400(self):
+        """Verify an invalid date is rejected instead of returning 500"""
+        response = self.client.get(self.url, {"date": "not-a-date"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_all_attendance_range_returns_matrix(self):
+        """Verify from/to returns one state per student per day"""
+        ahmed = self.create_student("Ahmed")
+        self.create_student("Bilal")
+        Attendance.objects.create(
+            student=ahmed, attendance_date=date(2024, 3, 1), state="present"
+        )
+        Attendance.objects.create(
+            student=ahmed, attendance_date=date(2024, 3, 3), state="absent"
+        )
+        Attendance.objects.create(
+            student=ahmed, attendance_date=date(2024, 3, 4), state="present"
+        )
+
+        response = self.client.get(self.url, {"from": "2024-03-01", "to": "2024-03-03"})
+        data = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["dates"], ["2024-03-01", "2024-03-02", "2024-03-03"])
+        self.assertEqual(data["students"][0]["states"], ["present", None, "absent"])
+        self.assertEqual(data["students"][1]["states"], [None, None, None])
+
+    def test_all_attendance_range_with_from_after_to_returns_400(self):
+        """Verify an inverted range is rejected"""
+        response = self.client.get(self.url, {"from": "2024-03-05", "to": "2024-03-01"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_all_attendance_query_count_is_constant(self):
+        """Verify the query count does not grow with the number of students"""
+        for params in ({"date": "2024-03-01"}, {"from": "2024-03-01", "to": "2024-03-31"}):
+            Student.objects.all().delete()
+            counts = []
+            for roster_size in (1, 20):
+                for index in range(Student.objects.count(), roster_size):
+                    student = self.create_student(f"Student{index}")
+                    Attendance.objects.create(
+                        student=student, attendance_date=date(2024, 3, 1), state="present"
+                    )
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(self.url, params)
+                counts.append(len(context.captured_queries))
+            self.assertEqual(counts[0], counts[1])
+
+
+class BulkAttendanceViewTests(AttendanceTestCase):
+    """Test cases for POST /api/v1/attendance/bulk"""
+
+    url = "/api/v1/attendance/bulk"
+
+    def _post(self, rows):
+        return self.client.post(
+            self.url, data=json.dumps(rows), content_type="application/json"
+        )
+
+    def test_bulk_attendance_creates_and_updates_rows(self):
+        """Verify new rows are created and existing rows are updated in place"""
+        ahmed = self.create_student("Ahmed")
+        bilal = self.create_student("Bilal")
+        Attendance.objects.create(
+            student=ahmed, attendance_date=date(2024, 3, 4), state="absent"
+        )
+
+        response = self._post(
+            [
+                {"student": ahmed.code, "date": "2024-03-04", "state": "present"},
+                {"student": bilal.code, "date": "2024-03-04", "state": "absent"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["status"] for row in json.loads(response.content)],
+            ["updated", "created"],
+        )
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertEqual(
+            Attendance.objects.get(student=ahmed, attendance_date=date(2024, 3, 4)).state,
+            "present",
+        )
+        self.assertEqual(
+            Attendance.objects.get(student=bilal, attendance_date=date(2024, 3, 4)).state,
+            "absent",
+        )
+
+    def test_bulk_attendance_rejects_students_of_other_doctors(self):
+        """Verify the whole batch is rejected when one student is not owned"""
+        ahmed = self.create_student("Ahmed")
+        zaid = self.create_student("Zaid", doctor=self.other_doctor)
+
+        response = self._post(
+            [
+                {"student": ahmed.code, "date": "2024-03-04", "state": "present"},
+                {"student": zaid.code, "date": "2024-03-04", "state": "present"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_bulk_attendance_rejects_duplicate_rows(self):
+        """Verify the same student and date cannot appear twice in one batch"""
+        ahmed = self.create_student("Ahmed")
+
+        response = self._post(
+            [
+                {"student": ahmed.code, "date": "2024-03-04", "state": "present"},
+                {"student": ahmed.code, "date": "2024-03-04", "state": "absent"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_attendance_rejects_invalid_state(self):
+        """Verify rows with an unknown state are rejected"""
+        ahmed = self.create_student("Ahmed")
+
+        response = self._post(
+            [{"student": ahmed.code, "date": "2024-03-04", "state": "late"}]
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_attendance_rejects_future_dates(self):
+        """Verify the whole batch is rejected when one row is dated in the future"""
+        student = self.create_student("Ahmed")
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+
+        response = self._post(
+            [
+                {"student": student.code, "date": "2024-03-04", "state": "present"},
+                {"student": student.code, "date": tomorrow, "state": "present"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_bulk_attendance_rejects_empty_list(self):
+        """Verify an empty batch is rejected"""
+        response = self._post([])
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_attendance_query_count_is_constant(self):
+        """Verify the query count does not grow with the number of rows"""
+        counts = []
+        for roster_size in (1, 20):
+            rows = [
+                {
+                    "student": self.create_student(f"Student{roster_size}-{index}").code,
+                    "date": "2024-03-04",
+                    "state": "present",
+                }
+                for index in range(roster_size)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                self._post(rows)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_attendance_does_not_load_the_doctor(self):
+        """Verify ownership is checked on the doctor code, without the lazy Doctor"""
+        rows = [{"student": self.create_student("Student").code, "date": "2024-03-04", "state": "present"}]
+        with mock.patch("api.views.get_doctor") as get_doctor:
+            response = self._post(rows)
+            self.client.get("/api/v1/attendance/all", {"date": "2024-03-04"})
+
+        self.assertEqual(response.status_code, 200)
+        get_doctor.assert_not_called()
@@ -1,19 +1,38 @@
-from datetime import date
+from datetime import date, timedelta
 
 from rest_framework import status
 from rest_framework import generics
-from stu.views import student_action_decorator
+from stu.permissions import student_owner_permission
 from api.views import authentication_decorator
+from api.transactions import write_transaction
+from api.response_cache import bump_version, cached_response
 from rest_framework.response import Response
 from api.serializers import created_serializer, success_serializer
 from django.utils.decorators import method_decorator
+from django.db.models import FilteredRelation, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from stu.models import Student
+from stu.statistics import refresh_stats
 from .models import Attendance
 from functools import wraps
 from .serializers import (
     attendance_serializer,
+    bulk_attendance_serializer,
     date_serializer,
 )
 
+MAX_ATTENDANCE_RANGE_DAYS = 366
+MAX_BULK_ATTENDANCE_ROWS = 1000
+
+
+def month_range(day):
+    """
+    First day of day's month and first day of the next month, for range
+    filters that can use an index on the date column (unlike __month/__year)
+    """
+    first = day.replace(day=1)
+    return first, (first + timedelta(days=32)).replace(day=1)
+
 
 def year_month_decorator(func):
     @wraps(func)
@@ -34,11 +53,12 @@ def year_month_decorator(func):
 
 
 class create_attendance_view(generics.CreateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = Attendance.objects.all()
     serializer_class = attendance_serializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def create(self, request, *args, **kwargs):
         """
         Create a new attendance record
@@ -47,25 +67,92 @@ class create_attendance_view(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         date = serializer.validated_data["attendance_date"]
 
-        try:
-            att = Attendance.objects.get(student=request.student, attendance_date=date)
-            att.state = serializer.validated_data["state"]
-            att.save()
-            success = success_serializer(data={})
-            success.is_valid(raise_exception=False)
-            return Response(success.data, status=status.HTTP_200_OK)
-        except Attendance.DoesNotExist:
-            serializer.save(student=request.student, attendance_date=date)
+        # Safe against a concurrent insert of the same day
+        _, created = Attendance.objects.update_or_create(
+            student=request.student,
+            attendance_date=date,
+            defaults={"state": serializer.validated_data["state"]},
+        )
+        if created:
             success = created_serializer(data={})
             success.is_valid(raise_exception=False)
             return Response(success.data, status=status.HTTP_201_CREATED)
+        success = success_serializer(data={})
+        success.is_valid(raise_exception=False)
+        return Response(success.data, status=status.HTTP_200_OK)
+
+
+class bulk_attendance_view(generics.GenericAPIView):
+    serializer_class = bulk_attendance_serializer
+
+    @method_decorator(authentication_decorator)
+    @method_decorator(write_transaction)
+    def post(self, request, *args, **kwargs):
+        """
+        Create or update attendance records for many students at once
+        Body: [{"student": "123456", "date": "YYYY-MM-DD", "state": "present"}, ...]
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False,
+            max_length=MAX_BULK_ATTENDANCE_ROWS,
+        )
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data
+
+        keys = [(row["student"], row["date"]) for row in rows]
+        if len(set(keys)) != len(keys):
+            raise ValidationError("Duplicate student and date in request")
+
+        student_codes = {row["student"] for row in rows}
+        owned = set(
+            Student.objects.filter(
+                doctor_id=request.code, code__in=student_codes
+            ).values_list("code", flat=True)
+        )
+        if owned != student_codes:
+            # Same answer as stu.permissions.get_owned_student
+            raise NotFound("Student not found")
+
+        existing = set(
+            Attendance.objects.filter(
+                student__in=student_codes,
+                attendance_date__in={row["date"] for row in rows},
+            ).values_list("student_id", "attendance_date")
+        )
+        Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    student_id=row["student"],
+                    attendance_date=row["date"],
+                    state=row["state"],
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=["student", "attendance_date"],
+            update_fields=["state", "updated_at"],
+        )
+        # bulk_create does not send post_save, refresh the summaries here
+        refresh_stats(student_codes, [Attendance])
+        bump_version(request.code)
+
+        result = [
+            {
+                "student": row["student"],
+                "date": row["date"].isoformat(),
+                "state": row["state"],
+                "status": "updated" if key in existing else "created",
+            }
+            for row, key in zip(rows, keys)
+        ]
+        return Response(result, status=status.HTTP_200_OK)
 
 
 class get_attendance_view(generics.GenericAPIView):
+    permission_classes = [student_owner_permission]
     serializer_class = attendance_serializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
     def get(self, request, *args, **kwargs):
         """
         Get attendance record for a student, given student code and date month
@@ -83,14 +170,13 @@ class get_attendance_view(generics.GenericAPIView):
         date_serializer_instance = date_serializer(data={"date": f"{year}-{month}-01"})
         date_serializer_instance.is_valid(raise_exception=True)
 
-        month = date_serializer_instance.validated_data["date"].month
-        year = date_serializer_instance.validated_data["date"].year
+        start, end = month_range(date_serializer_instance.validated_data["date"])
 
         queryset = queryset.filter(
             student=request.student,
             state__in=["present", "absent"],
-            attendance_date__month=month,
-            attendance_date__year=year,
+            attendance_date__gte=start,
+            attendance_date__lt=end,
         )
 
         serializer = self.get_serializer(queryset, many=True)
@@ -99,59 +185,100 @@ class get_attendance_view(generics.GenericAPIView):
 
 class get_all_students_attendance_view(generics.GenericAPIView):
     """
-    Get attendance for all students for a specific date
+    Get attendance for all students for a specific date or date range
     """
-    
+
+    def _parse_date(self, value, default=None):
+        if not value:
+            return default
+        date_serializer_instance = date_serializer(data={"date": value})
+        date_serializer_instance.is_valid(raise_exception=True)
+        return date_serializer_instance.validated_data["date"]
+
     @method_decorator(authentication_decorator)
+    @method_decorator(cached_response("attendance_all"))
     def get(self, request, *args, **kwargs):
         """
         Get attendance records for all students for a specific date
         Query params:
         - date: YYYY-MM-DD format (defaults to today)
+        - from, to: YYYY-MM-DD format, returns a student x day matrix instead
         """
-        try:
-            from stu.models import Student
-            
-            # Get date parameter
-            date_param = request.query_params.get("date")
-            if not date_param:
-                target_date = date.today()
-            else:
-                date_serializer_instance = date_serializer(data={"date": date_param})
-                date_serializer_instance.is_valid(raise_exception=True)
-                target_date = date_serializer_instance.validated_data["date"]
-            
-            # Get only students belonging to the logged-in doctor
-            students = Student.objects.filter(doctor=request.doctor).order_by('first_name', 'last_name')
-            
-            # Build response with attendance status
-            result = []
-            for student in students:
-                try:
-                    attendance = Attendance.objects.get(
-                        student=student,
-                        attendance_date=target_date
-                    )
-                    status_value = attendance.state
-                except Attendance.DoesNotExist:
-                    status_value = None  # Not marked
-                
-                # Combine first_name and last_name
-                full_name = f"{student.first_name} {student.last_name}".strip()
-                
-                result.append({
-                    "code": student.code,
-                    "name": full_name,
-                    "status": status_value,
-                    "date": target_date.isoformat()
-                })
-            
-            return Response(result, status=status.HTTP_200_OK)
-        except Exception as e:
-            import traceback
-            print(f"Error in get_all_students_attendance_view: {str(e)}")
-            print(traceback.format_exc())
-            return Response(
-                {"error": str(e), "detail": "Internal server error"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        date_from = request.query_params.get("from")
+        date_to = request.query_params.get("to")
+        if date_from or date_to:
+            return self.get_range(request, date_from, date_to)
+
+        target_date = self._parse_date(request.query_params.get("date"), date.today())
+
+        # LEFT JOIN each student of the logged-in doctor to the day's attendance
+        students = (
+            Student.objects.filter(doctor_id=request.code)
+            .annotate(
+                day=FilteredRelation(
+                    "attendance", condition=Q(attendance__attendance_date=target_date)
+                )
             )
+            .values("code", "first_name", "last_name", "day__state")
+            .order_by("first_name", "last_name")
+        )
+
+        result = [
+            {
+                "code": student["code"],
+                "name": f"{student['first_name']} {student['last_name']}".strip(),
+                "status": student["day__state"],
+                "date": target_date.isoformat(),
+            }
+            for student in students
+        ]
+        return Response(result, status=status.HTTP_200_OK)
+
+    def get_range(self, request, date_from, date_to):
+        """
+        Get a compact student x day attendance matrix, one state (or None when
+        not marked) per day between from and to inclusive
+        """
+        date_to = self._parse_date(date_to, date.today())
+        date_from = self._parse_date(date_from, date_to)
+        if date_from > date_to:
+            raise ValidationError("from must be before to")
+        days = (date_to - date_from).days + 1
+        if days > MAX_ATTENDANCE_RANGE_DAYS:
+            raise ValidationError(
+                f"Date range cannot exceed {MAX_ATTENDANCE_RANGE_DAYS} days"
+            )
+
+        students = (
+            Student.objects.filter(doctor_id=request.code)
+            .values("code", "first_name", "last_name")
+            .order_by("first_name", "last_name")
+        )
+        records = Attendance.objects.filter(
+            student__doctor_id=request.code,
+            attendance_date__range=(date_from, date_to),
+        ).values_list("student_id", "attendance_date", "state")
+
+        states = {}
+        for student_code, attendance_date, state in records:
+            states.setdefault(student_code, [None] * days)[
+                (attendance_date - date_from).days
+            ] = state
+
+        result = {
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "dates": [
+                (date_from + timedelta(days=offset)).isoformat()
+                for offset in range(days)
+            ],
+            "students": [
+                {
+                    "code": student["code"],
+                    "name": f"{student['first_name']} {student['last_name']}".strip(),
+                    "states": states.get(student["code"], [None] * days),
+                }
+                for student in students
+            ],
+        }
+        return Response(result, status=status.HTTP_200_OK)
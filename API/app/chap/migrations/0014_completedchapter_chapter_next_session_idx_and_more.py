@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chap', '0013_auto_20251105_2330'),
+        ('stu', '0008_studentstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='completedchapter',
+            index=models.Index(condition=models.Q(('next_surah__isnull', False)), fields=['student', 'session_type', 'created_at'], name='chapter_next_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='completedchapter',
+            index=models.Index(fields=['student', 'session_type', 'completion_date'], name='chapter_history_idx'),
+        ),
+    ]
@@ -94,6 +94,19 @@ class CompletedChapter(models.Model):
         verbose_name = "Completed Chapter"
         verbose_name_plural = "Completed Chapters"
         ordering = ["-completion_date"]
+        indexes = [
+            # Latest planned session per student and type (stu.views.annotate_next_sessions)
+            models.Index(
+                fields=["student", "session_type", "created_at"],
+                condition=models.Q(next_surah__isnull=False),
+                name="chapter_next_session_idx",
+            ),
+            # Session history per student and type (stu.student_stats)
+            models.Index(
+                fields=["student", "session_type", "completion_date"],
+                name="chapter_history_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.code} - {self.chapter.code}"
@@ -0,0 +1,7 @@
+"""
+In-process registry of the 114 surahs (chap/initial_data.json)
+"""
+from api.reference import ReferenceRegistry
+from .models import Chapter
+
+surahs = ReferenceRegistry(Chapter, ("code", "name", "number_of_verses"))
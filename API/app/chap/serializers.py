@@ -1,8 +1,14 @@
 from rest_framework import serializers
+from api.reference import ReferenceField
 from .models import CompletedChapter
+from .reference import surahs
 
 
 class create_chapter_completion_serializer(serializers.ModelSerializer):
+    chapter = ReferenceField(surahs)
+    surah = ReferenceField(surahs, allow_null=True, required=False)
+    next_surah = ReferenceField(surahs, allow_null=True, required=False)
+
     class Meta:
         fields = [
             "session_type",
@@ -25,6 +31,10 @@ class create_chapter_completion_serializer(serializers.ModelSerializer):
 
 
 class update_chapter_completion_serializer(serializers.ModelSerializer):
+    chapter = ReferenceField(surahs)
+    surah = ReferenceField(surahs, allow_null=True, required=False)
+    next_surah = ReferenceField(surahs, allow_null=True, required=False)
+
     class Meta:
         fields = [
             "session_type",
@@ -58,13 +68,16 @@ class list_chapter_completion_serializer(serializers.ModelSerializer):
     next_surah = serializers.SerializerMethodField()
 
     def get_chapter(self, obj):
-        return obj.chapter.name if obj.chapter else None
+        chapter = surahs.get(obj.chapter_id)
+        return chapter.name if chapter else None
 
     def get_surah(self, obj):
-        return {"code": obj.surah.code, "name": obj.surah.name} if obj.surah else None
+        surah = surahs.get(obj.surah_id)
+        return {"code": surah.code, "name": surah.name} if surah else None
 
     def get_next_surah(self, obj):
-        return {"code": obj.next_surah.code, "name": obj.next_surah.name} if obj.next_surah else None
+        next_surah = surahs.get(obj.next_surah_id)
+        return {"code": next_surah.code, "name": next_surah.name} if next_surah else None
 
     class Meta:
         fields = [
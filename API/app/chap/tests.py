@@ -0,0 +1,170 @@
+"""
+Tests for the chapter completion endpoints
+"""
+
+import json
+from datetime import date
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from api.testing import DoctorTestCase
+from chap.models import Chapter, CompletedChapter
+from chap.reference import surahs
+
+
+class ListChapterCompletionViewTests(DoctorTestCase):
+    """Test cases for GET /api/v1/chapters/<student>/completions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.student = cls.create_student()
+        cls.fatiha = Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+        cls.baqara = Chapter.objects.create(code=2, name="البقرة", number_of_verses=286)
+
+    def setUp(self):
+        super().setUp()
+        self.url = f"/api/v1/chapters/{self.student.code}/completions"
+
+    def _create_completions(self, count):
+        for _ in range(count):
+            CompletedChapter.objects.create(
+                student=self.student,
+                chapter=self.fatiha,
+                surah=self.fatiha,
+                next_surah=self.baqara,
+            )
+
+    def test_list_completions_returns_related_names(self):
+        """Verify chapter, surah and next surah are serialized"""
+        self._create_completions(1)
+
+        response = self.client.get(self.url)
+        row = json.loads(response.content)[0]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(row["chapter"], "الفاتحة")
+        self.assertEqual(row["surah"], {"code": 1, "name": "الفاتحة"})
+        self.assertEqual(row["next_surah"], {"code": 2, "name": "البقرة"})
+
+    def test_list_completions_query_count_is_constant(self):
+        """Verify the query count does not grow with the number of sessions"""
+        # Warm up the per-process reference registry
+        surahs.entries
+        counts = []
+        for total in (1, 30):
+            self._create_completions(total - CompletedChapter.objects.count())
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url)
+            self.assertEqual(len(json.loads(response.content)), total)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_list_completions_pages_follow_cursor(self):
+        """Verify pages cover every session, undated sessions last"""
+        for completion_date in (date(2024, 3, 1), date(2024, 3, 2), date(2024, 3, 2), None, None):
+            CompletedChapter.objects.create(
+                student=self.student, chapter=self.fatiha, completion_date=completion_date
+            )
+
+        codes = []
+        params = {"limit": 2}
+        while True:
+            page = json.loads(self.client.get(self.url, params).content)
+            codes.extend(row["code"] for row in page["results"])
+            if not page["next_cursor"]:
+                break
+            params = {"limit": 2, "cursor": page["next_cursor"]}
+
+        expected = list(
+            CompletedChapter.objects.order_by(
+                F("completion_date").desc(nulls_last=True), "-code"
+            ).values_list("code", flat=True)
+        )
+        self.assertEqual(codes, expected)
+
+
+class ListSurahsViewTests(DoctorTestCase):
+    """Test cases for GET /api/v1/chapters/<student>/surahs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+        Chapter.objects.create(code=2, name="البقرة", number_of_verses=286)
+
+    def setUp(self):
+        super().setUp()
+        self.url = "/api/v1/chapters/1/surahs"
+        # Drop rows cached by earlier tests whose writes were rolled back
+        surahs.invalidate()
+
+    def test_list_surahs_is_served_from_registry(self):
+        """Verify surahs are listed without querying the Chapter table"""
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(
+            json.loads(response.content),
+            [
+                {"code": 1, "name": "الفاتحة", "number_of_verses": 7},
+                {"code": 2, "name": "البقرة", "number_of_verses": 286},
+            ],
+        )
+        self.assertFalse(
+            any('"Chapter"' in query["sql"] for query in context.captured_queries)
+        )
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_list_surahs_with_matching_etag_returns_304(self):
+        """Verify a matching If-None-Match gets 304 Not Modified"""
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_surahs_etag_changes_when_reloaded(self):
+        """Verify reloading the surahs invalidates the registry and ETag"""
+        etag = self.client.get(self.url)["ETag"]
+
+        Chapter.objects.filter(code=2).first().save()
+        Chapter.objects.create(code=3, name="آل عمران", number_of_verses=200)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)), 3)
+
+
+class ChapterCompletionValidationTests(DoctorTestCase):
+    """Test cases for surah validation on POST /api/v1/chapters/<student>/create"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.student = cls.create_student()
+        Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+
+    def setUp(self):
+        super().setUp()
+        self.url = f"/api/v1/chapters/{self.student.code}/create"
+
+    def _post(self, data):
+        return self.client.post(self.url, data=json.dumps(data), content_type="application/json")
+
+    def test_create_completion_with_known_surah(self):
+        """Verify a completion referencing a known surah is created"""
+        response = self._post({"chapter": 1, "surah": 1, "next_surah": None})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(CompletedChapter.objects.get().surah_id, 1)
+
+    def test_create_completion_with_unknown_surah_returns_400(self):
+        """Verify an unknown surah code is rejected"""
+        response = self._post({"chapter": 1, "surah": 115})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CompletedChapter.objects.exists())
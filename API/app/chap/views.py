@@ -1,8 +1,11 @@
 from rest_framework import generics
 from .models import CompletedChapter, Chapter
 from django.utils.decorators import method_decorator
-from stu.views import student_action_decorator
+from stu.permissions import student_owner_permission
 from api.views import authentication_decorator
+from api.transactions import write_transaction
+from api.pagination import KeysetPagination
+from stu.etags import student_condition
 from api.serializers import created_serializer, success_serializer
 from rest_framework.response import Response
 from .serializers import (
@@ -13,14 +16,18 @@ from .serializers import (
 )
 from api.serializers import code_serializer
 from rest_framework import status
+from .reference import surahs
+
+SURAHS_MAX_AGE = 60 * 60 * 24
 
 
 class create_chapter_completion_view(generics.CreateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedChapter.objects.all()
     serializer_class = create_chapter_completion_serializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def create(self, request, *args, **kwargs):
         """
         Create a new chapter completion record
@@ -34,12 +41,13 @@ class create_chapter_completion_view(generics.CreateAPIView):
 
 
 class update_chapter_completion_view(generics.UpdateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedChapter.objects.all()
     serializer_class = update_chapter_completion_serializer
     lookup_field = "code"
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def update(self, request, *args, **kwargs):
         """
         Update a chapter completion record
@@ -55,12 +63,13 @@ class update_chapter_completion_view(generics.UpdateAPIView):
 
 
 class delete_chapter_completion_view(generics.DestroyAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedChapter.objects.all()
     serializer_class = delete_chapter_completion_serializer
     lookup_field = "code"
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def delete(self, request, *args, **kwargs):
         """
         Delete a chapter completion record
@@ -73,18 +82,23 @@ class delete_chapter_completion_view(generics.DestroyAPIView):
 
 
 class list_chapter_completion_view(generics.GenericAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedChapter.objects.all()
     serializer_class = list_chapter_completion_serializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(student_condition("chapters"))
     def get(self, request, *args, **kwargs):
         """
         List chapter completion records for a student
         """
-        queryset = CompletedChapter.objects.filter(student=request.student)
+        pagination = KeysetPagination(["completion_date", "code"])
+        queryset = pagination.paginate_queryset(
+            CompletedChapter.objects.filter(student=request.student),
+            request,
+        )
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return pagination.get_paginated_response(serializer.data)
 
 
 class list_surahs_view(generics.GenericAPIView):
@@ -95,5 +109,11 @@ class list_surahs_view(generics.GenericAPIView):
         """
         List all Surahs (Chapters) of the Quran
         """
-        surahs = Chapter.objects.all().values('code', 'name', 'number_of_verses').order_by('code')
-        return Response(list(surahs))
+        etag = f'"{surahs.etag}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response([surah._asdict() for surah in surahs.all()])
+        response["ETag"] = etag
+        response["Cache-Control"] = f"private, max-age={SURAHS_MAX_AGE}"
+        return response
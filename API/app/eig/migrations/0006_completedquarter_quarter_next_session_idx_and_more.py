@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eig', '0005_completedquarter_session_type'),
+        ('stu', '0008_studentstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='completedquarter',
+            index=models.Index(condition=models.Q(('next_hizb_number__isnull', False)), fields=['student', 'session_type', 'created_at'], name='quarter_next_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='completedquarter',
+            index=models.Index(fields=['student', 'session_type', 'completion_date'], name='quarter_history_idx'),
+        ),
+    ]
@@ -70,3 +70,16 @@ class CompletedQuarter(models.Model):
         verbose_name = "Completed Quarter"
         verbose_name_plural = "Completed Quarters"
         ordering = ["-completion_date"]
+        indexes = [
+            # Latest planned session per student and type (stu.views.annotate_next_sessions)
+            models.Index(
+                fields=["student", "session_type", "created_at"],
+                condition=models.Q(next_hizb_number__isnull=False),
+                name="quarter_next_session_idx",
+            ),
+            # Session history per student and type (stu.student_stats)
+            models.Index(
+                fields=["student", "session_type", "completion_date"],
+                name="quarter_history_idx",
+            ),
+        ]
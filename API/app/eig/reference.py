@@ -0,0 +1,7 @@
+"""
+In-process registry of the 60 hizbs (eig/initial_data.json)
+"""
+from api.reference import ReferenceRegistry
+from .models import Quarter
+
+hizbs = ReferenceRegistry(Quarter, ("code", "name"))
@@ -1,8 +1,12 @@
 from rest_framework import serializers
+from api.reference import ReferenceField
 from .models import CompletedQuarter
+from .reference import hizbs
 
 
 class create_quarter_completion_serializer(serializers.ModelSerializer):
+    quarter = ReferenceField(hizbs, allow_null=True, required=False)
+
     class Meta:
         fields = [
             "session_type",
@@ -23,6 +27,8 @@ class create_quarter_completion_serializer(serializers.ModelSerializer):
 
 
 class update_quarter_completion_serializer(serializers.ModelSerializer):
+    quarter = ReferenceField(hizbs, allow_null=True, required=False)
+
     class Meta:
         fields = [
             "session_type",
@@ -52,7 +58,8 @@ class list_quarter_completion_serializer(serializers.ModelSerializer):
     quarter = serializers.SerializerMethodField()
 
     def get_quarter(self, obj):
-        return obj.quarter.name if obj.quarter else None
+        quarter = hizbs.get(obj.quarter_id)
+        return quarter.name if quarter else None
 
     class Meta:
         fields = [
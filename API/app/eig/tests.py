@@ -1,3 +1,76 @@
+"""
+Tests for the quarter completion endpoints
+"""
+
+import json
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from api.testing import DoctorTestCase
+from eig.models import CompletedQuarter, Quarter
+from eig.reference import hizbs
+
+
+class ListQuarterCompletionViewTests(DoctorTestCase):
+    """Test cases for GET /api/v1/quarters/<student>/completions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.student = cls.create_student(memorization_method="eighth")
+        cls.quarter = Quarter.objects.create(code="1", name="الحزب الأوّل")
+
+    def setUp(self):
+        super().setUp()
+        self.url = f"/api/v1/quarters/{self.student.code}/completions"
+
+    def _create_completions(self, count):
+        for _ in range(count):
+            CompletedQuarter.objects.create(
+                student=self.student, quarter=self.quarter, hizb_number=1, eighth_number=1
+            )
+
+    def test_list_completions_returns_quarter_name(self):
+        """Verify the quarter name is serialized"""
+        self._create_completions(1)
+
+        response = self.client.get(self.url)
+        row = json.loads(response.content)[0]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(row["quarter"], "الحزب الأوّل")
+
+    def test_list_completions_query_count_is_constant(self):
+        """Verify the query count does not grow with the number of sessions"""
+        # Warm up the per-process reference registry
+        hizbs.entries
+        counts = []
+        for total in (1, 30):
+            self._create_completions(total - CompletedQuarter.objects.count())
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url)
+            self.assertEqual(len(json.loads(response.content)), total)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class HizbRegistryTests(TestCase):
+    """Test cases for the in-process copy of the Quarter table"""
+
+    def setUp(self):
+        for code in ("2", "10", "1", "extra"):
+            Quarter.objects.create(code=code, name=f"Hizb {code}")
+        hizbs.invalidate()
+        self.addCleanup(hizbs.invalidate)
+
+    def test_entries_are_keyed_by_the_stored_code(self):
+        """Verify non-numeric codes load and lookups match the stored code exactly"""
+        self.assertEqual(hizbs.get("extra").name, "Hizb extra")
+        self.assertEqual(hizbs.get(10).name, "Hizb 10")
+        for code in ("01", " 1", "1_0", "3", None, True):
+            self.assertIsNone(hizbs.get(code))
 
-# Create your tests here.
+    def test_numeric_codes_keep_their_order(self):
+        """Verify all() lists numeric codes in numeric order, the others after"""
+        self.assertEqual([entry.code for entry in hizbs.all()], ["1", "2", "10", "extra"])
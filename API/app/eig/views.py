@@ -1,8 +1,11 @@
 from rest_framework import generics
 from .models import CompletedQuarter
 from django.utils.decorators import method_decorator
-from stu.views import student_action_decorator
+from stu.permissions import student_owner_permission
 from api.views import authentication_decorator
+from api.transactions import write_transaction
+from api.pagination import KeysetPagination
+from stu.etags import student_condition
 from api.serializers import created_serializer, success_serializer
 from rest_framework.response import Response
 from .serializers import (
@@ -16,11 +19,12 @@ from rest_framework import status
 
 
 class create_quarter_completion_view(generics.CreateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedQuarter.objects.all()
     serializer_class = create_quarter_completion_serializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def create(self, request, *args, **kwargs):
         """
         Create a new quarter completion record
@@ -34,12 +38,13 @@ class create_quarter_completion_view(generics.CreateAPIView):
 
 
 class update_quarter_completion_view(generics.UpdateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedQuarter.objects.all()
     serializer_class = update_quarter_completion_serializer
     lookup_field = "code"
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def update(self, request, *args, **kwargs):
         """
         Update a quarter completion record
@@ -55,12 +60,13 @@ class update_quarter_completion_view(generics.UpdateAPIView):
 
 
 class delete_quarter_completion_view(generics.DestroyAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedQuarter.objects.all()
     serializer_class = delete_quarter_completion_serializer
     lookup_field = "code"
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def delete(self, request, *args, **kwargs):
         """
         Delete a quarter completion record
@@ -73,15 +79,20 @@ class delete_quarter_completion_view(generics.DestroyAPIView):
 
 
 class list_quarter_completion_view(generics.GenericAPIView):
+    permission_classes = [student_owner_permission]
     queryset = CompletedQuarter.objects.all()
     serializer_class = list_quarter_completion_serializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(student_condition("quarters"))
     def get(self, request, *args, **kwargs):
         """
         List quarter completion records for a student
         """
-        queryset = CompletedQuarter.objects.filter(student=request.student)
+        pagination = KeysetPagination(["completion_date", "code"])
+        queryset = pagination.paginate_queryset(
+            CompletedQuarter.objects.filter(student=request.student),
+            request,
+        )
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return pagination.get_paginated_response(serializer.data)
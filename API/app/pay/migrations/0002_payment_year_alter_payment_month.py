@@ -4,6 +4,21 @@ import django.core.validators
 from django.db import migrations, models
 
 
+class AlterMonthToInteger(migrations.AlterField):
+    """
+    month changes from a date to a month number; PostgreSQL needs an explicit
+    conversion, SQLite rebuilds the table as usual
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        schema_editor.execute(
+            'ALTER TABLE "Payments" ALTER COLUMN "month" TYPE integer '
+            'USING EXTRACT(MONTH FROM "month")::integer'
+        )
+
+
 class Migration(migrations.Migration):
 
     dependencies = [
@@ -17,7 +32,7 @@ class Migration(migrations.Migration):
             field=models.IntegerField(default=2000, validators=[django.core.validators.MinValueValidator(2000), django.core.validators.MaxValueValidator(2100)]),
             preserve_default=False,
         ),
-        migrations.AlterField(
+        AlterMonthToInteger(
             model_name='payment',
             name='month',
             field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)]),
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_doctor_shard'),
+        ('pay', '0005_payment_doctor'),
+        ('stu', '0008_studentstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='api.doctor'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['doctor', 'year', 'month'], name='payment_doctor_period_idx'),
+        ),
+    ]
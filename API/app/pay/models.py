@@ -10,8 +10,9 @@ class Payment(models.Model):
     Model to track student payment records
     """
 
+    # Indexed by payment_doctor_period_idx
     doctor = models.ForeignKey(
-        Doctor, on_delete=models.CASCADE, related_name="payments"
+        Doctor, on_delete=models.CASCADE, related_name="payments", db_index=False
     )
     student = models.ForeignKey(
         Student, on_delete=models.CASCADE, related_name="payments"
@@ -31,6 +32,10 @@ class Payment(models.Model):
         verbose_name = "Payment"
         verbose_name_plural = "Payments"
         ordering = ["-month", "student"]
+        indexes = [
+            # Doctor totals and a doctor's payments of one month
+            models.Index(fields=["doctor", "year", "month"], name="payment_doctor_period_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["student", "month", "year"],
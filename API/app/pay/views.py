@@ -1,5 +1,5 @@
 from django.db.models import Sum
-from stu.views import student_action_decorator
+from stu.permissions import student_owner_permission
 from .serializers import (
     DoctorPaymentSerializer,
     PaymentCreateSerializer,
@@ -8,6 +8,9 @@ from .serializers import (
 )
 from django.utils.decorators import method_decorator
 from api.views import authentication_decorator
+from api.transactions import write_transaction
+from api.response_cache import cached_response, doctor_condition
+from stu.etags import student_condition
 from rest_framework.response import Response
 from att.views import year_month_decorator
 from django.db.models import Prefetch
@@ -19,11 +22,12 @@ from .models import Payment
 
 
 class create_payment_view(generics.CreateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = Payment.objects.all()
     serializer_class = PaymentCreateSerializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def create(self, request, *args, **kwargs):
         """
         Create a new payment record
@@ -34,14 +38,17 @@ class create_payment_view(generics.CreateAPIView):
         month = serializer.validated_data["month"]
         year = serializer.validated_data["year"]
 
-        instance = Payment.objects.filter(
-            student=request.student, month=month, year=year
-        ).first()
-        if instance:
-            instance.amount = serializer.validated_data["amount"]
-            instance.save()
-        else:
-            serializer.save(student=request.student, doctor=request.doctor)
+        # Safe against a concurrent insert of the same month
+        Payment.objects.update_or_create(
+            student=request.student,
+            month=month,
+            year=year,
+            defaults={"amount": serializer.validated_data["amount"]},
+            create_defaults={
+                "amount": serializer.validated_data["amount"],
+                "doctor": request.doctor,
+            },
+        )
         return Response(serializer.data, status=201)
 
 
@@ -49,6 +56,8 @@ class DoctorPaymentView(generics.GenericAPIView):
     serializer_class = DoctorPaymentSerializer
 
     @method_decorator(authentication_decorator)
+    @method_decorator(doctor_condition("payments"))
+    @method_decorator(cached_response("payments"))
     @method_decorator(year_month_decorator)
     def get(self, request, *args, **kwargs):
         """
@@ -56,7 +65,7 @@ class DoctorPaymentView(generics.GenericAPIView):
         """
         monthly_payment = Payment.objects.filter(month=request.month, year=request.year)
         students = (
-            Student.objects.filter(doctor=request.doctor)
+            Student.objects.filter(doctor_id=request.code)
             .prefetch_related(
                 Prefetch(
                     "payments", queryset=monthly_payment, to_attr="monthly_payment"
@@ -69,10 +78,11 @@ class DoctorPaymentView(generics.GenericAPIView):
 
 
 class student_payment_view(generics.GenericAPIView):
+    permission_classes = [student_owner_permission]
     serializer_class = StudentPaymentSerializer
 
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(student_condition("payments"))
     def get(self, request, *args, **kwargs):
         """
         Get payment record for a student
@@ -88,12 +98,14 @@ class get_all_payments_view(generics.GenericAPIView):
     serializer_class = get_all_payments_serializer
 
     @method_decorator(authentication_decorator)
+    @method_decorator(doctor_condition("payments_total"))
+    @method_decorator(cached_response("payments_total"))
     def get(self, request, *args, **kwargs):
         """
         Get total payments for all students
         """
         total = (
-            Payment.objects.filter(doctor=request.doctor).aggregate(
+            Payment.objects.filter(doctor_id=request.code).aggregate(
                 total_amount=Sum("amount")
             )["total_amount"]
             or 0.0
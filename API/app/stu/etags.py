@@ -0,0 +1,41 @@
+"""
+ETags of the views of one student, for conditional GETs
+
+A student's responses only change with the student row (updated_at) or with
+its attendance, sessions and payments, every write of which bumps the version
+of its StudentStats row (see stu.statistics.refresh_stats), and with the
+month for the detail's payed flag
+"""
+from django.core.exceptions import ObjectDoesNotExist
+from django.views.decorators.http import condition
+from datetime import date
+from api.response_cache import query_digest
+
+
+def student_version(student):
+    """
+    Validator of the student's data, None without a StudentStats row
+    """
+    try:
+        version = student.stats.version
+    except ObjectDoesNotExist:
+        return None
+    # student_detail_serializer.payed is about the current month
+    month = date.today().strftime("%Y-%m")
+    return f"{student.code}.{student.updated_at.timestamp():.6f}.{version}.{month}"
+
+
+def student_condition(name):
+    """
+    condition() for a view of request.student, answering a matching
+    If-None-Match with 304 before the view runs
+    """
+
+    def etag_func(request, *args, **kwargs):
+        version = student_version(request.student)
+        if version is None:
+            return None
+        return f'"{name}.{version}.{query_digest(request)}"'
+
+    return condition(etag_func=etag_func)
+
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from api.sharding import shard_aliases, use_shard
+from stu.models import Student
+from stu.statistics import rebuild_stats, verify_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the StudentStats summary table, or verify it against the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare stored statistics with freshly computed ones",
+        )
+        parser.add_argument("--doctor", help="Limit to the students of this doctor code")
+
+    def handle(self, *args, **options):
+        mismatched = 0
+        for alias in shard_aliases() or [DEFAULT_DB_ALIAS]:
+            with use_shard(alias):
+                mismatched += self.handle_database(alias, options)
+        if mismatched:
+            raise CommandError(f"{mismatched} mismatched statistics")
+
+    def handle_database(self, alias, options):
+        students = Student.objects.order_by("code")
+        if options["doctor"]:
+            students = students.filter(doctor=options["doctor"])
+        student_codes = list(students.values_list("code", flat=True))
+
+        if options["verify"]:
+            mismatches = verify_stats(student_codes)
+            for code, field, stored, expected in mismatches:
+                self.stderr.write(f"Student {code}: {field} is {stored}, expected {expected}")
+            self.stdout.write(f"Verified statistics of {len(student_codes)} students in {alias}")
+            return len(mismatches)
+
+        rebuild_stats(student_codes)
+        self.stdout.write(f"Rebuilt statistics of {len(student_codes)} students in {alias}")
+        return 0
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stu', '0007_student_student_first_n_f17196_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='stu.student')),
+                ('attendance_total', models.IntegerField(default=0)),
+                ('attendance_present', models.IntegerField(default=0)),
+                ('attendance_absent', models.IntegerField(default=0)),
+                ('payments_count', models.IntegerField(default=0)),
+                ('payments_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('chapter_sessions', models.IntegerField(default=0)),
+                ('chapter_review_sessions', models.IntegerField(default=0)),
+                ('chapter_completed_surahs', models.IntegerField(default=0)),
+                ('chapter_rating_sum', models.IntegerField(default=0)),
+                ('chapter_rating_count', models.IntegerField(default=0)),
+                ('quarter_sessions', models.IntegerField(default=0)),
+                ('quarter_review_sessions', models.IntegerField(default=0)),
+                ('quarter_rating_sum', models.IntegerField(default=0)),
+                ('quarter_rating_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'StudentStats',
+            },
+        ),
+    ]
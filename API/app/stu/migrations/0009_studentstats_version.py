@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stu', '0008_studentstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentstats',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,81 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+BATCH_SIZE = 500
+
+# stu.statistics.AGGREGATES as of this migration, on the historical models
+AGGREGATES = {
+    ("att", "Attendance"): {
+        "attendance_total": Count("id"),
+        "attendance_present": Count("id", filter=Q(state="present")),
+        "attendance_absent": Count("id", filter=Q(state="absent")),
+    },
+    ("pay", "Payment"): {
+        "payments_count": Count("id"),
+        "payments_amount": Sum("amount"),
+    },
+    ("chap", "CompletedChapter"): {
+        "chapter_sessions": Count("code", filter=Q(session_type="memorization")),
+        "chapter_review_sessions": Count("code", filter=Q(session_type="review")),
+        "chapter_completed_surahs": Count(
+            "code", filter=Q(session_type="memorization", is_surah_completed=True)
+        ),
+        "chapter_rating_sum": Sum("rating"),
+        "chapter_rating_count": Count("rating"),
+    },
+    ("eig", "CompletedQuarter"): {
+        "quarter_sessions": Count("code", filter=Q(session_type="memorization")),
+        "quarter_review_sessions": Count("code", filter=Q(session_type="review")),
+        "quarter_rating_sum": Sum("rating"),
+        "quarter_rating_count": Count("rating"),
+    },
+}
+
+
+def backfill_stats(apps, schema_editor):
+    """
+    Create the StudentStats rows of the students added before the table,
+    which refresh_stats would otherwise skip until a read rebuilt them
+    """
+    alias = schema_editor.connection.alias
+    Student = apps.get_model("stu", "Student")
+    StudentStats = apps.get_model("stu", "StudentStats")
+    student_codes = list(
+        Student.objects.using(alias)
+        .filter(stats__isnull=True)
+        .order_by("code")
+        .values_list("code", flat=True)
+    )
+    for start in range(0, len(student_codes), BATCH_SIZE):
+        batch = student_codes[start : start + BATCH_SIZE]
+        stats = {code: {} for code in batch}
+        for model, aggregates in AGGREGATES.items():
+            rows = (
+                apps.get_model(*model).objects.using(alias)
+                .filter(student__in=batch)
+                .values("student")
+                .annotate(**aggregates)
+                .order_by()
+            )
+            for row in rows:
+                student_code = row.pop("student")
+                stats[student_code].update({k: v or 0 for k, v in row.items()})
+        StudentStats.objects.using(alias).bulk_create(
+            [StudentStats(student_id=code, **values) for code, values in stats.items()],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stu', '0009_studentstats_version'),
+        ('att', '0002_attendance_updated_at'),
+        ('chap', '0014_completedchapter_chapter_next_session_idx_and_more'),
+        ('eig', '0006_completedquarter_quarter_next_session_idx_and_more'),
+        ('pay', '0006_alter_payment_doctor_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
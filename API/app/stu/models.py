@@ -1,17 +1,14 @@
 from django.db import models
 from django.core.validators import RegexValidator
 from api.models import Doctor
+from api.codes import next_code
 from datetime import date
-import random
 
 digits = RegexValidator(r"^\d+$", "Only digits are allowed.")
 
 
 def generate_code():
-    while True:
-        code = random.randint(100000, 999999)
-        if not Student.objects.filter(code=code).exists():
-            return code
+    return next_code("student")
 
 
 class Student(models.Model):
@@ -51,3 +48,76 @@ class Student(models.Model):
                 violation_error_message="Student with this first and last name already exists for this doctor",
             )
         ]
+
+
+class StudentStats(models.Model):
+    """
+    Per-student statistics kept current by stu.signals, rebuilt and verified
+    with the rebuild_student_stats management command
+    """
+
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    attendance_total = models.IntegerField(default=0)
+    attendance_present = models.IntegerField(default=0)
+    attendance_absent = models.IntegerField(default=0)
+    payments_count = models.IntegerField(default=0)
+    payments_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    chapter_sessions = models.IntegerField(default=0)
+    chapter_review_sessions = models.IntegerField(default=0)
+    chapter_completed_surahs = models.IntegerField(default=0)
+    chapter_rating_sum = models.IntegerField(default=0)
+    chapter_rating_count = models.IntegerField(default=0)
+    quarter_sessions = models.IntegerField(default=0)
+    quarter_review_sessions = models.IntegerField(default=0)
+    quarter_rating_sum = models.IntegerField(default=0)
+    quarter_rating_count = models.IntegerField(default=0)
+    # Bumped by every refresh, i.e. every write to the student's rows (see stu.etags)
+    version = models.PositiveIntegerField(default=0)
+
+    def as_dict(self, memorization_method):
+        """
+        Statistics payload for the given memorization method
+        """
+        attendance_rate = (
+            (self.attendance_present / self.attendance_total * 100)
+            if self.attendance_total > 0
+            else 0
+        )
+        if memorization_method == "chapter":
+            total_sessions = self.chapter_sessions
+            total_review_sessions = self.chapter_review_sessions
+            completed_surahs = self.chapter_completed_surahs
+            rating_sum, rating_count = self.chapter_rating_sum, self.chapter_rating_count
+        else:
+            total_sessions = self.quarter_sessions
+            total_review_sessions = self.quarter_review_sessions
+            completed_surahs = 0  # Not applicable for eighth method
+            rating_sum, rating_count = self.quarter_rating_sum, self.quarter_rating_count
+        avg_rating = rating_sum / rating_count if rating_count else 0
+
+        return {
+            "attendance": {
+                "total": self.attendance_total,
+                "present": self.attendance_present,
+                "absent": self.attendance_absent,
+                "rate": round(attendance_rate, 1),
+            },
+            "payments": {
+                "total_count": self.payments_count,
+                "total_amount": float(self.payments_amount),
+            },
+            "memorization": {
+                "total_sessions": total_sessions,
+                "total_review_sessions": total_review_sessions,
+                "completed_surahs": completed_surahs,
+                "average_rating": round(avg_rating, 1),
+            },
+        }
+
+    def __str__(self):
+        return f"Stats for student {self.student_id}"
+
+    class Meta:
+        db_table = "StudentStats"
@@ -0,0 +1,38 @@
+from rest_framework.exceptions import NotAuthenticated, NotFound
+from rest_framework.permissions import BasePermission
+from api import metrics
+from .models import Student
+
+
+def get_owned_student(request, student_code):
+    """
+    Return the student with the given code if it belongs to the authenticated
+    doctor, checked in a single query on the doctor foreign key column
+    Missing and foreign students raise the same 404, so codes are not leaked
+    """
+    doctor_code = getattr(request, "code", None)
+    if not doctor_code:
+        # Rejected before authentication_decorator, which counts the others
+        metrics.auth_failures.inc(getattr(request, "auth_failure", None) or "missing")
+        raise NotAuthenticated("Authentication credentials were not provided.")
+    student = None
+    if student_code:
+        student = (
+            Student.objects.filter(code=student_code, doctor_id=doctor_code)
+            .select_related("stats")
+            .first()
+        )
+    if not student:
+        raise NotFound("Student not found")
+    return student
+
+
+class student_owner_permission(BasePermission):
+    """
+    Allow access to views routed with a <student> code only to the student's
+    doctor, and attach the student as request.student
+    """
+
+    def has_permission(self, request, view):
+        request.student = get_owned_student(request, view.kwargs.get("student"))
+        return True
@@ -1,5 +1,6 @@
 from datetime import date
 from rest_framework import serializers
+from chap.reference import surahs
 from .models import Student
 
 
@@ -68,66 +69,61 @@ class student_list_serializer(serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
     next_review_session = serializers.SerializerMethodField()
     next_memorization_session = serializers.SerializerMethodField()
+    # Only present when requested through the roster's include parameter
+    attendance = serializers.CharField(
+        source="attendance_state", read_only=True, allow_null=True
+    )
+    payment = serializers.DecimalField(
+        source="payment_amount",
+        max_digits=10,
+        decimal_places=2,
+        read_only=True,
+        allow_null=True,
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include = self.context.get("include", ())
+        for name in ("attendance", "payment"):
+            if name not in include:
+                fields.pop(name)
+        return fields
 
     def get_name(self, obj):
         return f"{obj.first_name} {obj.last_name}"
     
     def get_next_review_session(self, obj):
         """Get the next planned review session for this student"""
-        if obj.memorization_method == "chapter":
-            # Get the latest REVIEW chapter completion with a next_surah planned
-            latest = obj.completed_chapters.filter(
-                session_type='review',
-                next_surah__isnull=False
-            ).order_by('-created_at').first()
-            
-            if latest and latest.next_surah:
-                session_text = f"{latest.next_surah.name}"
-                if latest.next_verse_from and latest.next_verse_to:
-                    session_text += f" ({latest.next_verse_from}-{latest.next_verse_to})"
-                return session_text
-        else:
-            # Get the latest REVIEW quarter completion with a next_hizb planned
-            latest = obj.completed_quarters.filter(
-                session_type='review',
-                next_hizb_number__isnull=False
-            ).order_by('-created_at').first()
-            
-            if latest and latest.next_hizb_number:
-                session_text = f"الحزب{latest.next_hizb_number}"
-                if latest.next_eighth_number:
-                    session_text += f" الثمن{latest.next_eighth_number}"
-                return session_text
-        
-        return None
-    
+        return self._next_session(obj, "review")
+
     def get_next_memorization_session(self, obj):
         """Get the next planned memorization session for this student"""
+        return self._next_session(obj, "memorization")
+
+    def _next_session(self, obj, session_type):
+        """
+        Format the latest planned session from the attributes annotated by
+        stu.views.annotate_next_sessions
+        """
+        prefix = f"next_{session_type}"
         if obj.memorization_method == "chapter":
-            # Get the latest MEMORIZATION chapter completion with a next_surah planned
-            latest = obj.completed_chapters.filter(
-                session_type='memorization',
-                next_surah__isnull=False
-            ).order_by('-created_at').first()
-            
-            if latest and latest.next_surah:
-                session_text = f"{latest.next_surah.name}"
-                if latest.next_verse_from and latest.next_verse_to:
-                    session_text += f" ({latest.next_verse_from}-{latest.next_verse_to})"
+            next_surah = surahs.get(getattr(obj, f"{prefix}_surah"))
+            if next_surah:
+                session_text = f"{next_surah.name}"
+                verse_from = getattr(obj, f"{prefix}_verse_from")
+                verse_to = getattr(obj, f"{prefix}_verse_to")
+                if verse_from and verse_to:
+                    session_text += f" ({verse_from}-{verse_to})"
                 return session_text
         else:
-            # Get the latest MEMORIZATION quarter completion with a next_hizb planned
-            latest = obj.completed_quarters.filter(
-                session_type='memorization',
-                next_hizb_number__isnull=False
-            ).order_by('-created_at').first()
-            
-            if latest and latest.next_hizb_number:
-                session_text = f"الحزب{latest.next_hizb_number}"
-                if latest.next_eighth_number:
-                    session_text += f" الثمن{latest.next_eighth_number}"
+            hizb_number = getattr(obj, f"{prefix}_hizb_number")
+            if hizb_number:
+                session_text = f"الحزب{hizb_number}"
+                eighth_number = getattr(obj, f"{prefix}_eighth_number")
+                if eighth_number:
+                    session_text += f" الثمن{eighth_number}"
                 return session_text
-        
+
         return None
 
     class Meta:
@@ -143,4 +139,6 @@ class student_list_serializer(serializers.ModelSerializer):
             "date_of_registration",
             "next_review_session",
             "next_memorization_session",
+            "attendance",
+            "payment",
         ]
@@ -0,0 +1,36 @@
+"""
+Keep StudentStats current on every save and delete of the tables it summarizes
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from api.models import Doctor
+from .models import Student, StudentStats
+from .statistics import AGGREGATES, refresh_stats
+
+
+@receiver(post_save, sender=Student)
+def create_student_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        StudentStats.objects.get_or_create(student=instance)
+
+
+def refresh_student_stats(sender, instance, raw=False, **kwargs):
+    """
+    Recompute the sender's fields for the instance's student, inside the
+    writing transaction so the summary commits or rolls back with the write
+    """
+    if raw:
+        return
+    # Rows deleted with their student or doctor take the stats row with them
+    origin = kwargs.get("origin")
+    if origin is not None:
+        model = origin.model if isinstance(origin, QuerySet) else type(origin)
+        if issubclass(model, (Student, Doctor)):
+            return
+    refresh_stats([instance.student_id], [sender])
+
+
+for model in AGGREGATES:
+    post_save.connect(refresh_student_stats, sender=model, dispatch_uid=f"stats_save_{model.__name__}")
+    post_delete.connect(refresh_student_stats, sender=model, dispatch_uid=f"stats_delete_{model.__name__}")
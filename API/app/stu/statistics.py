@@ -0,0 +1,158 @@
+"""
+Maintenance of the materialized StudentStats table
+"""
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+from att.models import Attendance
+from chap.models import CompletedChapter
+from eig.models import CompletedQuarter
+from pay.models import Payment
+from .models import StudentStats
+
+BATCH_SIZE = 500
+
+# StudentStats fields computed from each table, grouped by student
+AGGREGATES = {
+    Attendance: {
+        "attendance_total": Count("id"),
+        "attendance_present": Count("id", filter=Q(state="present")),
+        "attendance_absent": Count("id", filter=Q(state="absent")),
+    },
+    Payment: {
+        "payments_count": Count("id"),
+        "payments_amount": Sum("amount"),
+    },
+    CompletedChapter: {
+        "chapter_sessions": Count("code", filter=Q(session_type="memorization")),
+        "chapter_review_sessions": Count("code", filter=Q(session_type="review")),
+        "chapter_completed_surahs": Count(
+            "code", filter=Q(session_type="memorization", is_surah_completed=True)
+        ),
+        "chapter_rating_sum": Sum("rating"),
+        "chapter_rating_count": Count("rating"),
+    },
+    CompletedQuarter: {
+        "quarter_sessions": Count("code", filter=Q(session_type="memorization")),
+        "quarter_review_sessions": Count("code", filter=Q(session_type="review")),
+        "quarter_rating_sum": Sum("rating"),
+        "quarter_rating_count": Count("rating"),
+    },
+}
+
+
+def compute_stats(student_codes, models=None):
+    """
+    Compute the StudentStats fields of the given tables for the given students,
+    with one grouped query per table
+    Returns a dict of field values keyed by student code
+    """
+    models = models or list(AGGREGATES)
+    fields = [field for model in models for field in AGGREGATES[model]]
+    stats = {code: dict.fromkeys(fields, 0) for code in student_codes}
+    for model in models:
+        rows = (
+            model.objects.filter(student__in=student_codes)
+            .values("student")
+            .annotate(**AGGREGATES[model])
+            .order_by()
+        )
+        for row in rows:
+            student_code = row.pop("student")
+            stats[student_code].update({k: v or 0 for k, v in row.items()})
+    return stats
+
+
+def refresh_stats(student_codes, models=None):
+    """
+    Recompute the given tables' fields of existing StudentStats rows and bump
+    their version, used after writes to keep the table current
+    """
+    student_codes = [str(code) for code in student_codes]
+    models = models or list(AGGREGATES)
+    fields = [field for model in models for field in AGGREGATES[model]]
+    alias = router.db_for_write(StudentStats)
+    with transaction.atomic(using=alias):
+        # Concurrent writers of a student take turns: each aggregates after the
+        # previous one committed, instead of storing counts missing its rows
+        # (SQLite already serializes its writers)
+        if connections[alias].features.has_select_for_update:
+            list(
+                StudentStats.objects.using(alias)
+                .select_for_update()
+                .filter(student__in=student_codes)
+                .order_by("student")
+                .values_list("student", flat=True)
+            )
+        stats = compute_stats(student_codes, models)
+        StudentStats.objects.bulk_update(
+            [
+                StudentStats(student_id=code, version=F("version") + 1, **values)
+                for code, values in stats.items()
+            ],
+            fields + ["version"],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def rebuild_stats(student_codes):
+    """
+    Recompute and upsert the full StudentStats rows of the given students and
+    bump their version, so ETags of repaired rows change too
+    Returns the rebuilt rows
+    """
+    student_codes = [str(code) for code in student_codes]
+    fields = [field for aggregates in AGGREGATES.values() for field in aggregates]
+    rebuilt = []
+    for start in range(0, len(student_codes), BATCH_SIZE):
+        stats = compute_stats(student_codes[start : start + BATCH_SIZE])
+        rows = [StudentStats(student_id=code, **values) for code, values in stats.items()]
+        StudentStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["student"],
+            update_fields=fields,
+        )
+        batch = [row.student_id for row in rows]
+        StudentStats.objects.filter(student__in=batch).update(version=F("version") + 1)
+        rebuilt.extend(StudentStats.objects.filter(student__in=batch))
+    return rebuilt
+
+
+def verify_stats(student_codes):
+    """
+    Compare the stored StudentStats rows against freshly computed values
+    Returns a list of (student_code, field, stored, expected) mismatches
+    """
+    student_codes = [str(code) for code in student_codes]
+    fields = [field for aggregates in AGGREGATES.values() for field in aggregates]
+    mismatches = []
+    for start in range(0, len(student_codes), BATCH_SIZE):
+        batch = student_codes[start : start + BATCH_SIZE]
+        expected = compute_stats(batch)
+        stored = StudentStats.objects.in_bulk(batch)
+        for code in batch:
+            if code not in stored:
+                mismatches.append((code, "*", None, "missing row"))
+                continue
+            for field in fields:
+                value = getattr(stored[code], field)
+                if value != expected[code][field]:
+                    mismatches.append((code, field, value, expected[code][field]))
+    return mismatches
+
+
+def get_stats(students):
+    """
+    Return the StudentStats rows of the given students (fetched with
+    select_related("stats")) keyed by student code, rebuilding missing rows
+    """
+    stats = {}
+    missing = []
+    for student in students:
+        try:
+            stats[student.code] = student.stats
+        except StudentStats.DoesNotExist:
+            missing.append(student.code)
+    stats.update({row.student_id: row for row in rebuild_stats(missing)})
+    return stats
+
@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.conf import settings
+from api.sharding import locate_student, use_shard
 from .models import Student
 from rest_framework.exceptions import ValidationError
 
@@ -24,7 +26,11 @@ def student_login_view(request):
         raise ValidationError("Student code is required")
     
     try:
-        student = Student.objects.select_related('doctor').get(code=code)
+        if settings.SHARD_COUNT:
+            with use_shard(locate_student(code) or "shard_0"):
+                student = Student.objects.select_related('doctor').get(code=code)
+        else:
+            student = Student.objects.select_related('doctor').get(code=code)
         
         # Return student profile data
         data = {
@@ -5,273 +5,245 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Count, Q
+from api.views import authentication_decorator
+from api.pagination import KeysetPagination
 from .models import Student
+from .statistics import get_stats
+from .etags import student_condition
+from chap.reference import surahs
 from chap.models import CompletedChapter
 from eig.models import CompletedQuarter
 from att.models import Attendance
 from pay.models import Payment
 from rest_framework.exceptions import ValidationError
 from datetime import datetime, timedelta
+from functools import wraps
+
+
+SESSION_KEYS = ["completion_date", "code"]
+ATTENDANCE_KEYS = ["attendance_date", "id"]
+PAYMENT_KEYS = ["year", "month", "id"]
+
+
+def get_student(student_code):
+    try:
+        return Student.objects.select_related('stats').get(code=student_code)
+    except Student.DoesNotExist:
+        raise ValidationError("Student not found")
+
+
+def with_student(func):
+    """
+    Load the student of the student_code route as request.student, for the
+    student portal views that have no owner permission
+    """
+
+    @wraps(func)
+    def wrapper(request, student_code, *args, **kwargs):
+        request.student = get_student(student_code)
+        return func(request, student_code, *args, **kwargs)
+
+    return wrapper
+
+
+def session_queryset(student, session_type):
+    """
+    Sessions of the given type in the student's memorization method
+    """
+    if student.memorization_method == 'chapter':
+        model = CompletedChapter
+    else:
+        model = CompletedQuarter
+    return model.objects.filter(student=student, session_type=session_type)
+
+
+def session_data(session, session_type):
+    memorization = session_type == 'memorization'
+    if isinstance(session, CompletedChapter):
+        surah = surahs.get(session.surah_id)
+        data = {
+            "id": session.code,
+            "type": "chapter",
+            "session_type": session_type,
+            "surah_name": surah.name if surah else None,
+            "surah_number": surah.code if surah else None,
+            "verse_from": session.verse_from,
+            "verse_to": session.verse_to,
+        }
+        if memorization:
+            data["is_surah_completed"] = session.is_surah_completed
+    else:
+        data = {
+            "id": session.code,
+            "type": "eighth",
+            "session_type": session_type,
+            "hizb_number": session.hizb_number,
+            "eighth_number": session.eighth_number,
+        }
+        if memorization:
+            data["is_hizb_completed"] = session.is_hizb_completed
+    data.update({
+        "completion_date": session.completion_date.strftime('%Y-%m-%d') if session.completion_date else None,
+        "rating": session.rating,
+        "quick_notes": session.quick_notes,
+        "evaluation": session.evaluation,
+    })
+    if memorization:
+        data["progress"] = session.progress
+    data["feedback"] = session.feedback
+    return data
+
+
+def attendance_data(record):
+    return {
+        "id": record.id,
+        "attendance_date": record.attendance_date.strftime('%Y-%m-%d'),
+        "state": record.state,
+    }
+
+
+def payment_data(payment):
+    return {
+        "id": payment.id,
+        "amount": float(payment.amount),
+        "month": payment.month,
+        "year": payment.year,
+        "date": f"{str(payment.month).zfill(2)}-{payment.year}",
+        "created_at": payment.created_at.strftime('%Y-%m-%d'),
+    }
+
+
+def history_sections(student):
+    """
+    (name, queryset, keyset keys, serializer) of each history shown to a student
+    """
+    return [
+        ("memorization", session_queryset(student, 'memorization'), SESSION_KEYS,
+         lambda session: session_data(session, 'memorization')),
+        ("review", session_queryset(student, 'review'), SESSION_KEYS,
+         lambda session: session_data(session, 'review')),
+        ("attendance", Attendance.objects.filter(student=student), ATTENDANCE_KEYS,
+         attendance_data),
+        ("payment", Payment.objects.filter(student=student), PAYMENT_KEYS,
+         payment_data),
+    ]
+
+
+def history_response(request, section):
+    student = request.student
+    for name, queryset, keys, serialize in history_sections(student):
+        if name == section:
+            pagination = KeysetPagination(keys)
+            rows = pagination.paginate_queryset(queryset, request)
+            return pagination.get_paginated_response([serialize(row) for row in rows])
 
 
 @csrf_exempt
 @api_view(['GET'])
+@with_student
+@student_condition('memorization_history')
 def student_memorization_history_view(request, student_code):
     """
     Get student's memorization history
     """
-    try:
-        student = Student.objects.get(code=student_code)
-        
-        if student.memorization_method == 'chapter':
-            # Get chapter-based memorization
-            sessions = CompletedChapter.objects.filter(
-                student=student,
-                session_type='memorization'
-            ).select_related('surah', 'next_surah').order_by('-completion_date')
-            
-            data = []
-            for session in sessions:
-                data.append({
-                    "id": session.code,
-                    "type": "chapter",
-                    "session_type": "memorization",
-                    "surah_name": session.surah.name if session.surah else None,
-                    "surah_number": session.surah.code if session.surah else None,
-                    "verse_from": session.verse_from,
-                    "verse_to": session.verse_to,
-                    "is_surah_completed": session.is_surah_completed,
-                    "completion_date": session.completion_date.strftime('%Y-%m-%d') if session.completion_date else None,
-                    "rating": session.rating,
-                    "quick_notes": session.quick_notes,
-                    "evaluation": session.evaluation,
-                    "progress": session.progress,
-                    "feedback": session.feedback,
-                })
-        else:
-            # Get eighth-based memorization
-            sessions = CompletedQuarter.objects.filter(
-                student=student,
-                session_type='memorization'
-            ).select_related('quarter').order_by('-completion_date')
-            
-            data = []
-            for session in sessions:
-                data.append({
-                    "id": session.code,
-                    "type": "eighth",
-                    "session_type": "memorization",
-                    "hizb_number": session.hizb_number,
-                    "eighth_number": session.eighth_number,
-                    "is_hizb_completed": session.is_hizb_completed,
-                    "completion_date": session.completion_date.strftime('%Y-%m-%d') if session.completion_date else None,
-                    "rating": session.rating,
-                    "quick_notes": session.quick_notes,
-                    "evaluation": session.evaluation,
-                    "progress": session.progress,
-                    "feedback": session.feedback,
-                })
-        
-        return Response(data, status=status.HTTP_200_OK)
-        
-    except Student.DoesNotExist:
-        raise ValidationError("Student not found")
+    return history_response(request, 'memorization')
 
 
 @csrf_exempt
 @api_view(['GET'])
+@with_student
+@student_condition('review_history')
 def student_review_history_view(request, student_code):
     """
     Get student's review history
     """
-    try:
-        student = Student.objects.get(code=student_code)
-        
-        if student.memorization_method == 'chapter':
-            sessions = CompletedChapter.objects.filter(
-                student=student,
-                session_type='review'
-            ).select_related('surah').order_by('-completion_date')
-            
-            data = []
-            for session in sessions:
-                data.append({
-                    "id": session.code,
-                    "type": "chapter",
-                    "session_type": "review",
-                    "surah_name": session.surah.name if session.surah else None,
-                    "surah_number": session.surah.code if session.surah else None,
-                    "verse_from": session.verse_from,
-                    "verse_to": session.verse_to,
-                    "completion_date": session.completion_date.strftime('%Y-%m-%d') if session.completion_date else None,
-                    "rating": session.rating,
-                    "quick_notes": session.quick_notes,
-                    "evaluation": session.evaluation,
-                    "feedback": session.feedback,
-                })
-        else:
-            sessions = CompletedQuarter.objects.filter(
-                student=student,
-                session_type='review'
-            ).select_related('quarter').order_by('-completion_date')
-            
-            data = []
-            for session in sessions:
-                data.append({
-                    "id": session.code,
-                    "type": "eighth",
-                    "session_type": "review",
-                    "hizb_number": session.hizb_number,
-                    "eighth_number": session.eighth_number,
-                    "completion_date": session.completion_date.strftime('%Y-%m-%d') if session.completion_date else None,
-                    "rating": session.rating,
-                    "quick_notes": session.quick_notes,
-                    "evaluation": session.evaluation,
-                    "feedback": session.feedback,
-                })
-        
-        return Response(data, status=status.HTTP_200_OK)
-        
-    except Student.DoesNotExist:
-        raise ValidationError("Student not found")
+    return history_response(request, 'review')
 
 
 @csrf_exempt
 @api_view(['GET'])
+@with_student
+@student_condition('attendance_history')
 def student_attendance_history_view(request, student_code):
     """
     Get student's attendance history
     """
-    try:
-        student = Student.objects.get(code=student_code)
-        
-        attendance_records = Attendance.objects.filter(
-            student=student
-        ).order_by('-attendance_date')
-        
-        data = []
-        for record in attendance_records:
-            data.append({
-                "id": record.id,
-                "attendance_date": record.attendance_date.strftime('%Y-%m-%d'),
-                "state": record.state,
-            })
-        
-        return Response(data, status=status.HTTP_200_OK)
-        
-    except Student.DoesNotExist:
-        raise ValidationError("Student not found")
+    return history_response(request, 'attendance')
 
 
 @csrf_exempt
 @api_view(['GET'])
+@with_student
+@student_condition('payment_history')
 def student_payment_history_view(request, student_code):
     """
     Get student's payment history
     """
-    try:
-        student = Student.objects.get(code=student_code)
-        
-        payments = Payment.objects.filter(
-            student=student
-        ).order_by('-year', '-month')
-        
-        data = []
-        for payment in payments:
-            data.append({
-                "id": payment.id,
-                "amount": float(payment.amount),
-                "month": payment.month,
-                "year": payment.year,
-                "date": f"{str(payment.month).zfill(2)}-{payment.year}",
-                "created_at": payment.created_at.strftime('%Y-%m-%d'),
-            })
-        
-        return Response(data, status=status.HTTP_200_OK)
-        
-    except Student.DoesNotExist:
-        raise ValidationError("Student not found")
+    return history_response(request, 'payment')
 
 
 @csrf_exempt
 @api_view(['GET'])
+@with_student
+@student_condition('dashboard')
+def student_dashboard_view(request, student_code):
+    """
+    Get the student's statistics and the most recent entries of each history
+    in one response
+    Query params:
+    - memorization_limit, review_limit, attendance_limit, payment_limit:
+      number of entries per history (default 50, at most 500)
+    Each history is {"results", "next_cursor"}; next_cursor continues on the
+    matching *-history endpoint
+    """
+    student = request.student
+    data = {
+        "statistics": get_stats([student])[student.code].as_dict(student.memorization_method),
+    }
+    for name, queryset, keys, serialize in history_sections(student):
+        pagination = KeysetPagination(keys)
+        limit = pagination.get_limit(request.query_params.get(f"{name}_limit"))
+        rows = pagination.page(queryset, limit)
+        data[f"{name}_history"] = {
+            "results": [serialize(row) for row in rows],
+            "next_cursor": pagination.next_cursor,
+        }
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@api_view(['GET'])
+@with_student
+@student_condition('statistics')
 def student_statistics_view(request, student_code):
     """
     Get student's overall statistics
     """
-    try:
-        student = Student.objects.get(code=student_code)
-        
-        # Attendance stats
-        total_attendance = Attendance.objects.filter(student=student).count()
-        present_count = Attendance.objects.filter(student=student, state='present').count()
-        absent_count = Attendance.objects.filter(student=student, state='absent').count()
-        attendance_rate = (present_count / total_attendance * 100) if total_attendance > 0 else 0
-        
-        # Payment stats
-        total_payments = Payment.objects.filter(student=student).count()
-        total_amount_paid = sum([float(p.amount) for p in Payment.objects.filter(student=student)])
-        
-        # Memorization stats
-        if student.memorization_method == 'chapter':
-            total_memorization_sessions = CompletedChapter.objects.filter(
-                student=student, 
-                session_type='memorization'
-            ).count()
-            total_review_sessions = CompletedChapter.objects.filter(
-                student=student, 
-                session_type='review'
-            ).count()
-            completed_surahs = CompletedChapter.objects.filter(
-                student=student,
-                session_type='memorization',
-                is_surah_completed=True
-            ).count()
-            
-            # Average rating
-            sessions_with_rating = CompletedChapter.objects.filter(
-                student=student,
-                rating__isnull=False
-            )
-            avg_rating = sum([s.rating for s in sessions_with_rating]) / len(sessions_with_rating) if sessions_with_rating else 0
-        else:
-            total_memorization_sessions = CompletedQuarter.objects.filter(
-                student=student,
-                session_type='memorization'
-            ).count()
-            total_review_sessions = CompletedQuarter.objects.filter(
-                student=student,
-                session_type='review'
-            ).count()
-            completed_surahs = 0  # Not applicable for eighth method
-            
-            sessions_with_rating = CompletedQuarter.objects.filter(
-                student=student,
-                rating__isnull=False
-            )
-            avg_rating = sum([s.rating for s in sessions_with_rating]) / len(sessions_with_rating) if sessions_with_rating else 0
-        
-        data = {
-            "attendance": {
-                "total": total_attendance,
-                "present": present_count,
-                "absent": absent_count,
-                "rate": round(attendance_rate, 1),
-            },
-            "payments": {
-                "total_count": total_payments,
-                "total_amount": total_amount_paid,
-            },
-            "memorization": {
-                "total_sessions": total_memorization_sessions,
-                "total_review_sessions": total_review_sessions,
-                "completed_surahs": completed_surahs,
-                "average_rating": round(avg_rating, 1),
-            }
+    student = request.student
+    data = get_stats([student])[student.code].as_dict(student.memorization_method)
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@csrf_exempt
+@api_view(['GET'])
+@authentication_decorator
+def doctor_statistics_view(request):
+    """
+    Get the overall statistics of every student of the authenticated doctor
+    """
+    students = (
+        Student.objects.filter(doctor_id=request.code)
+        .select_related('stats')
+        .order_by('first_name', 'last_name')
+    )
+    statistics = get_stats(students)
+
+    data = [
+        {
+            "code": student.code,
+            "name": f"{student.first_name} {student.last_name}",
+            **statistics[student.code].as_dict(student.memorization_method),
         }
-        
-        return Response(data, status=status.HTTP_200_OK)
-        
-    except Student.DoesNotExist:
-        raise ValidationError("Student not found")
+        for student in students
+    ]
+    return Response(data, status=status.HTTP_200_OK)
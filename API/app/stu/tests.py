@@ -0,0 +1,759 @@
+"""
+Tests for the student roster and statistics endpoints
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.testing import DoctorTestCase, create_doctor
+from att.models import Attendance
+from chap.models import Chapter, CompletedChapter
+from eig.models import CompletedQuarter
+from pay.models import Payment
+from chap.reference import surahs
+from stu.models import Student, StudentStats
+
+
+class ListStudentsViewTests(DoctorTestCase):
+    """Test cases for GET /api/v1/student/list"""
+
+    list_url = "/api/v1/student/list"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fatiha = Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+        cls.baqara = Chapter.objects.create(code=2, name="البقرة", number_of_verses=286)
+
+    def _create_student(self, index, memorization_method="chapter"):
+        student = self.create_student(f"Student{index}", memorization_method=memorization_method)
+        if memorization_method == "chapter":
+            for session_type in ("review", "memorization"):
+                CompletedChapter.objects.create(
+                    student=student,
+                    chapter=self.fatiha,
+                    session_type=session_type,
+                    next_surah=self.fatiha,
+                )
+                CompletedChapter.objects.create(
+                    student=student,
+                    chapter=self.fatiha,
+                    session_type=session_type,
+                    next_surah=self.baqara,
+                    next_verse_from=1,
+                    next_verse_to=5,
+                )
+        else:
+            for session_type in ("review", "memorization"):
+                CompletedQuarter.objects.create(
+                    student=student,
+                    session_type=session_type,
+                    next_hizb_number=3,
+                    next_eighth_number=2,
+                )
+        return student
+
+    def _count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_students_returns_latest_planned_sessions(self):
+        """Verify the roster reports the latest planned session per session type"""
+        self._create_student(1)
+        self._create_student(2, memorization_method="eighth")
+
+        response = self.client.get(self.list_url)
+        data = {row["first_name"]: row for row in json.loads(response.content)}
+
+        self.assertEqual(data["Student1"]["next_review_session"], "البقرة (1-5)")
+        self.assertEqual(data["Student1"]["next_memorization_session"], "البقرة (1-5)")
+        self.assertEqual(data["Student2"]["next_review_session"], "الحزب3 الثمن2")
+        self.assertEqual(data["Student2"]["next_memorization_session"], "الحزب3 الثمن2")
+
+    def test_list_students_without_sessions_returns_none(self):
+        """Verify students without planned sessions report None"""
+        self.create_student("Student0", gender="F", age=9)
+
+        response = self.client.get(self.list_url)
+        row = json.loads(response.content)[0]
+
+        self.assertIsNone(row["next_review_session"])
+        self.assertIsNone(row["next_memorization_session"])
+
+    def test_list_students_query_count_is_constant(self):
+        """Verify the roster query count does not grow with the number of students"""
+        # Warm up the per-process reference registry and doctor cache
+        surahs.entries
+        self.client.get(self.list_url)
+        self._create_student(1)
+        self._create_student(2, memorization_method="eighth")
+        small_roster_queries = self._count_queries()
+
+        for index in range(3, 23):
+            self._create_student(index, memorization_method=("chapter", "eighth")[index % 2])
+        large_roster_queries = self._count_queries()
+
+        self.assertEqual(small_roster_queries, large_roster_queries)
+
+    def test_list_students_includes_attendance_and_payment(self):
+        """Verify include embeds the day's attendance and the month's payment"""
+        paid = self._create_student(1)
+        self._create_student(2)
+        Attendance.objects.create(
+            student=paid, attendance_date=date(2024, 3, 4), state="present"
+        )
+        Attendance.objects.create(
+            student=paid, attendance_date=date(2024, 3, 5), state="absent"
+        )
+        Payment.objects.create(
+            doctor=self.doctor, student=paid, amount=Decimal("150"), month=3, year=2024
+        )
+
+        response = self.client.get(
+            self.list_url, {"include": "attendance,payment", "date": "2024-03-04"}
+        )
+        rows = {row["first_name"]: row for row in json.loads(response.content)}
+
+        self.assertEqual(rows["Student1"]["attendance"], "present")
+        self.assertEqual(rows["Student1"]["payment"], "150.00")
+        self.assertIsNone(rows["Student2"]["attendance"])
+        self.assertIsNone(rows["Student2"]["payment"])
+
+    def test_list_students_omits_extras_unless_included(self):
+        """Verify the default roster shape is unchanged"""
+        self._create_student(1)
+
+        row = json.loads(self.client.get(self.list_url).content)[0]
+
+        self.assertNotIn("attendance", row)
+        self.assertNotIn("payment", row)
+
+    def test_list_students_rejects_unknown_include(self):
+        """Verify an unknown include is rejected"""
+        response = self.client.get(self.list_url, {"include": "grades"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_students_with_includes_uses_the_same_queries(self):
+        """Verify the included extras do not add queries"""
+        surahs.entries
+        self.client.get(self.list_url)
+        for index in range(1, 21):
+            student = self._create_student(index)
+            Attendance.objects.create(
+                student=student, attendance_date=date(2024, 3, 4), state="present"
+            )
+
+        self.assertEqual(
+            self._count_queries(),
+            self._count_queries({"include": "attendance,payment", "date": "2024-03-04"}),
+        )
+
+
+class StudentStatisticsViewTests(DoctorTestCase):
+    """Test cases for GET /api/v1/student/<code>/statistics and /student/statistics"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fatiha = Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+
+    def _create_student(self, index, memorization_method="chapter"):
+        student = self.create_student(f"Student{index:02d}", memorization_method=memorization_method)
+        for day, state in ((1, "present"), (2, "present"), (3, "absent")):
+            Attendance.objects.create(
+                student=student, attendance_date=date(2024, 3, day), state=state
+            )
+        for month, amount in ((1, Decimal("100.50")), (2, Decimal("50.25"))):
+            Payment.objects.create(
+                doctor=self.doctor, student=student, amount=amount, month=month, year=2024
+            )
+        if memorization_method == "chapter":
+            CompletedChapter.objects.create(
+                student=student, chapter=self.fatiha, session_type="memorization",
+                is_surah_completed=True, rating=5,
+            )
+            CompletedChapter.objects.create(
+                student=student, chapter=self.fatiha, session_type="memorization", rating=4,
+            )
+            CompletedChapter.objects.create(
+                student=student, chapter=self.fatiha, session_type="review",
+            )
+        else:
+            CompletedQuarter.objects.create(student=student, session_type="memorization", rating=3)
+            CompletedQuarter.objects.create(student=student, session_type="review", rating=4)
+        return student
+
+    def test_student_statistics_for_chapter_method(self):
+        """Verify statistics are aggregated for a chapter-method student"""
+        student = self._create_student(1)
+
+        response = self.client.get(f"/api/v1/student/{student.code}/statistics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content),
+            {
+                "attendance": {"total": 3, "present": 2, "absent": 1, "rate": 66.7},
+                "payments": {"total_count": 2, "total_amount": 150.75},
+                "memorization": {
+                    "total_sessions": 2,
+                    "total_review_sessions": 1,
+                    "completed_surahs": 1,
+                    "average_rating": 4.5,
+                },
+            },
+        )
+
+    def test_student_statistics_for_eighth_method(self):
+        """Verify statistics are aggregated for an eighth-method student"""
+        student = self._create_student(1, memorization_method="eighth")
+
+        response = self.client.get(f"/api/v1/student/{student.code}/statistics")
+
+        self.assertEqual(
+            json.loads(response.content)["memorization"],
+            {
+                "total_sessions": 1,
+                "total_review_sessions": 1,
+                "completed_surahs": 0,
+                "average_rating": 3.5,
+            },
+        )
+
+    def test_student_statistics_without_records(self):
+        """Verify a student without records gets zeroed statistics"""
+        student = self.create_student("Student00")
+
+        response = self.client.get(f"/api/v1/student/{student.code}/statistics")
+        data = json.loads(response.content)
+
+        self.assertEqual(data["attendance"]["rate"], 0)
+        self.assertEqual(data["payments"]["total_amount"], 0)
+        self.assertEqual(data["memorization"]["average_rating"], 0)
+
+    def test_doctor_statistics_matches_per_student_statistics(self):
+        """Verify the doctor-wide statistics match each student's statistics"""
+        students = [self._create_student(1), self._create_student(2, "eighth")]
+
+        response = self.client.get("/api/v1/student/statistics")
+        data = json.loads(response.content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["code"] for row in data], [str(s.code) for s in students])
+        for row, student in zip(data, students):
+            expected = json.loads(
+                self.client.get(f"/api/v1/student/{student.code}/statistics").content
+            )
+            self.assertEqual({k: row[k] for k in expected}, expected)
+
+    def test_doctor_statistics_requires_authentication(self):
+        """Verify the doctor-wide statistics are not served anonymously"""
+        self.client.cookies.clear()
+
+        response = self.client.get("/api/v1/student/statistics")
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_doctor_statistics_query_count_is_constant(self):
+        """Verify the doctor-wide query count does not grow with the number of students"""
+        counts = []
+        for roster_size in (1, 10):
+            for index in range(Student.objects.count(), roster_size):
+                self._create_student(index, ("chapter", "eighth")[index % 2])
+            with CaptureQueriesContext(connection) as context:
+                self.client.get("/api/v1/student/statistics")
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class StudentStatsTests(DoctorTestCase):
+    """Test cases for the materialized StudentStats table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fatiha = Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.create_student()
+
+    def _stats(self):
+        return StudentStats.objects.get(student=self.student)
+
+    def test_stats_row_is_created_with_student(self):
+        """Verify a zeroed stats row exists as soon as the student is created"""
+        self.assertEqual(self._stats().attendance_total, 0)
+
+    @skipUnless(connection.features.has_select_for_update, "SQLite serializes its writers")
+    def test_stats_rows_are_locked_before_aggregating(self):
+        """Verify a refresh locks the student's stats row before reading the counts"""
+        with CaptureQueriesContext(connection) as context:
+            Attendance.objects.create(
+                student=self.student, attendance_date=date(2024, 3, 1), state="present"
+            )
+
+        sql = [query["sql"] for query in context.captured_queries]
+        lock = next(index for index, query in enumerate(sql) if "FOR UPDATE" in query)
+        aggregate = next(index for index, query in enumerate(sql) if "COUNT(" in query)
+        self.assertIn('"StudentStats"', sql[lock])
+        self.assertLess(lock, aggregate)
+        self.assertEqual(self._stats().attendance_total, 1)
+
+    def test_stats_follow_saves_and_deletes(self):
+        """Verify the stats are updated on every save and delete"""
+        attendance = Attendance.objects.create(
+            student=self.student, attendance_date=date(2024, 3, 1), state="present"
+        )
+        payment = Payment.objects.create(
+            doctor=self.doctor, student=self.student, amount=Decimal("10.00"), month=1, year=2024
+        )
+        CompletedChapter.objects.create(
+            student=self.student, chapter=self.fatiha, session_type="memorization", rating=4
+        )
+        CompletedQuarter.objects.create(student=self.student, session_type="review", rating=2)
+
+        stats = self._stats()
+        self.assertEqual((stats.attendance_total, stats.attendance_present), (1, 1))
+        self.assertEqual(stats.payments_amount, Decimal("10.00"))
+        self.assertEqual((stats.chapter_sessions, stats.chapter_rating_sum), (1, 4))
+        self.assertEqual((stats.quarter_review_sessions, stats.quarter_rating_count), (1, 1))
+
+        attendance.state = "absent"
+        attendance.save()
+        payment.amount = Decimal("25.50")
+        payment.save()
+        stats = self._stats()
+        self.assertEqual((stats.attendance_present, stats.attendance_absent), (0, 1))
+        self.assertEqual(stats.payments_amount, Decimal("25.50"))
+
+        attendance.delete()
+        payment.delete()
+        stats = self._stats()
+        self.assertEqual(stats.attendance_total, 0)
+        self.assertEqual(stats.payments_count, 0)
+
+    def test_deleting_student_with_records_cascades(self):
+        """Verify deleting a student removes its records and stats"""
+        Attendance.objects.create(
+            student=self.student, attendance_date=date(2024, 3, 1), state="present"
+        )
+
+        self.student.delete()
+
+        self.assertFalse(StudentStats.objects.exists())
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_deleting_student_does_not_refresh_stats_per_record(self):
+        """Verify the cascade does not recompute the stats of a deleted student once per record"""
+        Attendance.objects.bulk_create(
+            Attendance(student=self.student, attendance_date=date(2024, 3, day), state="present")
+            for day in range(1, 21)
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            self.student.delete()
+
+        self.assertLess(len(context.captured_queries), 20)
+
+    def test_bulk_attendance_updates_stats(self):
+        """Verify the bulk attendance endpoint keeps the stats current"""
+        self.client.post(
+            "/api/v1/attendance/bulk",
+            data=json.dumps(
+                [{"student": self.student.code, "date": "2024-03-01", "state": "present"}]
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(self._stats().attendance_present, 1)
+
+    def test_statistics_view_is_a_primary_key_lookup(self):
+        """Verify the statistics view reads the summary row in a single query"""
+        Attendance.objects.create(
+            student=self.student, attendance_date=date(2024, 3, 1), state="present"
+        )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/v1/student/{self.student.code}/statistics")
+
+        self.assertEqual(json.loads(response.content)["attendance"]["total"], 1)
+
+    def test_statistics_view_rebuilds_missing_row(self):
+        """Verify students without a stats row get one rebuilt on read"""
+        Attendance.objects.create(
+            student=self.student, attendance_date=date(2024, 3, 1), state="present"
+        )
+        StudentStats.objects.all().delete()
+
+        response = self.client.get(f"/api/v1/student/{self.student.code}/statistics")
+
+        self.assertEqual(json.loads(response.content)["attendance"]["total"], 1)
+        self.assertTrue(StudentStats.objects.filter(student=self.student).exists())
+
+    def test_rebuild_command_verifies_and_repairs_stats(self):
+        """Verify the management command detects and repairs drifted stats"""
+        Attendance.objects.create(
+            student=self.student, attendance_date=date(2024, 3, 1), state="present"
+        )
+        StudentStats.objects.filter(student=self.student).update(attendance_total=7)
+        version = self._stats().version
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_student_stats", "--verify", stdout=StringIO(), stderr=StringIO())
+
+        call_command("rebuild_student_stats", stdout=StringIO())
+        call_command("rebuild_student_stats", "--verify", stdout=StringIO())
+        self.assertEqual(self._stats().attendance_total, 1)
+        # Repaired rows get new ETags
+        self.assertGreater(self._stats().version, version)
+
+
+class StudentHistoryPaginationTests(DoctorTestCase):
+    """Test cases for cursor pagination and updated_since on the history endpoints"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.student = cls.create_student()
+        for day in range(1, 6):
+            Attendance.objects.create(
+                student=cls.student, attendance_date=date(2024, 3, day), state="present"
+            )
+        for month in range(1, 4):
+            Payment.objects.create(
+                doctor=cls.doctor, student=cls.student, amount=Decimal("10"), month=month, year=2024
+            )
+
+    def _walk(self, url, limit):
+        """Follow next_cursor until exhausted, returning every page"""
+        pages = []
+        params = {"limit": limit}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            page = json.loads(response.content)
+            pages.append(page["results"])
+            if not page["next_cursor"]:
+                return pages
+            params = {"limit": limit, "cursor": page["next_cursor"]}
+
+    def test_attendance_history_without_params_returns_full_list(self):
+        """Verify existing clients still receive a plain list"""
+        response = self.client.get(f"/api/v1/student/{self.student.code}/attendance-history")
+
+        self.assertEqual(len(json.loads(response.content)), 5)
+
+    def test_attendance_history_pages_follow_cursor(self):
+        """Verify pages are disjoint, ordered and cover every row"""
+        pages = self._walk(f"/api/v1/student/{self.student.code}/attendance-history", 2)
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            [row["attendance_date"] for page in pages for row in page],
+            ["2024-03-05", "2024-03-04", "2024-03-03", "2024-03-02", "2024-03-01"],
+        )
+
+    def test_payment_history_pages_follow_cursor(self):
+        """Verify payments are paged by (year, month, id)"""
+        pages = self._walk(f"/api/v1/student/{self.student.code}/payment-history", 2)
+
+        self.assertEqual([row["month"] for page in pages for row in page], [3, 2, 1])
+
+    def test_history_updated_since_returns_only_deltas(self):
+        """Verify updated_since filters out rows not updated since then"""
+        url = f"/api/v1/student/{self.student.code}/attendance-history"
+
+        self.assertEqual(len(json.loads(self.client.get(url, {"updated_since": "2000-01-01"}).content)), 5)
+        self.assertEqual(len(json.loads(self.client.get(url, {"updated_since": "2999-01-01"}).content)), 0)
+
+    def test_history_with_impossible_updated_since_returns_400(self):
+        """Verify well formed but impossible dates are rejected, not a server error"""
+        url = f"/api/v1/student/{self.student.code}/attendance-history"
+
+        for value in ("2024-13-01", "2024-02-30T10:00:00", "yesterday"):
+            self.assertEqual(self.client.get(url, {"updated_since": value}).status_code, 400)
+
+    def test_history_with_invalid_cursor_returns_400(self):
+        """Verify a malformed cursor is rejected"""
+        response = self.client.get(
+            f"/api/v1/student/{self.student.code}/attendance-history", {"cursor": "garbage"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class StudentDashboardViewTests(DoctorTestCase):
+    """Test cases for GET /api/v1/student/<code>/dashboard"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.student = cls.create_student()
+        fatiha = Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+        for day in range(1, 4):
+            for session_type in ("review", "memorization"):
+                CompletedChapter.objects.create(
+                    student=cls.student,
+                    chapter=fatiha,
+                    surah=fatiha,
+                    session_type=session_type,
+                    completion_date=date(2024, 3, day),
+                    rating=4,
+                )
+        for day in range(1, 6):
+            Attendance.objects.create(
+                student=cls.student, attendance_date=date(2024, 3, day), state="present"
+            )
+        for month in range(1, 3):
+            Payment.objects.create(
+                doctor=cls.doctor, student=cls.student, amount=Decimal("10"), month=month, year=2024
+            )
+
+    def setUp(self):
+        super().setUp()
+        surahs.invalidate()
+        self.url = f"/api/v1/student/{self.student.code}/dashboard"
+
+    def test_dashboard_matches_the_separate_endpoints(self):
+        """Verify each section equals the corresponding standalone response"""
+        data = json.loads(self.client.get(self.url).content)
+        base = f"/api/v1/student/{self.student.code}"
+
+        self.assertEqual(
+            data["statistics"], json.loads(self.client.get(f"{base}/statistics").content)
+        )
+        for section in ("memorization", "review", "attendance", "payment"):
+            self.assertEqual(
+                data[f"{section}_history"]["results"],
+                json.loads(self.client.get(f"{base}/{section}-history").content),
+            )
+            self.assertIsNone(data[f"{section}_history"]["next_cursor"])
+
+    def test_dashboard_limits_continue_on_history_endpoint(self):
+        """Verify per-section limits and that next_cursor resumes the history"""
+        data = json.loads(self.client.get(self.url, {"attendance_limit": 2}).content)
+        attendance = data["attendance_history"]
+
+        self.assertEqual(
+            [row["attendance_date"] for row in attendance["results"]],
+            ["2024-03-05", "2024-03-04"],
+        )
+        self.assertEqual(len(data["memorization_history"]["results"]), 3)
+
+        rest = json.loads(
+            self.client.get(
+                f"/api/v1/student/{self.student.code}/attendance-history",
+                {"cursor": attendance["next_cursor"]},
+            ).content
+        )
+        self.assertEqual(
+            [row["attendance_date"] for row in rest["results"]],
+            ["2024-03-03", "2024-03-02", "2024-03-01"],
+        )
+
+    def test_dashboard_uses_one_query_per_section(self):
+        """Verify the student and statistics are loaded once, plus one query per history"""
+        surahs.entries
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context.captured_queries), 5)
+
+    def test_dashboard_for_missing_student_returns_400(self):
+        """Verify an unknown student code is rejected"""
+        response = self.client.get("/api/v1/student/1/dashboard")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_dashboard_with_invalid_limit_returns_400(self):
+        """Verify a non numeric limit is rejected"""
+        response = self.client.get(self.url, {"payment_limit": "all"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class StudentOwnerPermissionTests(DoctorTestCase):
+    """Test cases for the student ownership check shared by the student routes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_doctor = create_doctor("Other", "other@example.com")
+        cls.student = cls.create_student()
+        cls.foreign_student = cls.create_student("Foreign", doctor=cls.other_doctor)
+
+
+    def test_owned_student_is_served(self):
+        """Verify the doctor can reach their own student"""
+        response = self.client.get(f"/api/v1/student/{self.student.code}/detail")
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_foreign_and_missing_students_return_the_same_404(self):
+        """Verify another doctor's student is indistinguishable from a missing one"""
+        foreign = self.client.get(f"/api/v1/student/{self.foreign_student.code}/detail")
+        missing = self.client.get("/api/v1/student/1/detail")
+
+        self.assertEqual(foreign.status_code, 404)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(foreign.content, missing.content)
+
+    def test_foreign_student_cannot_be_written(self):
+        """Verify writes through other apps are rejected before touching data"""
+        response = self.client.post(
+            f"/api/v1/attendance/{self.foreign_student.code}/create",
+            data=json.dumps({"attendance_date": "2024-03-04", "state": "present"}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_unauthenticated_request_returns_403(self):
+        """Verify a missing token is reported as such rather than as a 404"""
+        self.client.cookies.clear()
+
+        response = self.client.get(f"/api/v1/student/{self.student.code}/detail")
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_ownership_is_checked_in_one_query(self):
+        """Verify the ownership check neither loads the doctor nor queries twice"""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f"/api/v1/student/{self.student.code}/detail")
+
+        student_queries = [
+            query["sql"] for query in context.captured_queries if '"Student"' in query["sql"]
+        ]
+        self.assertEqual(len(student_queries), 1)
+        self.assertIn('"doctor_id"', student_queries[0])
+
+
+class ConditionalGetTests(DoctorTestCase):
+    """Test cases for the ETags of the student and payment read endpoints"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fatiha = Chapter.objects.create(code=1, name="الفاتحة", number_of_verses=7)
+        cls.student = cls.create_student()
+
+
+    def _etag(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def _revalidate(self, path, etag):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        return response, len(context.captured_queries)
+
+    def test_matching_etag_returns_304_without_running_the_view(self):
+        """Verify a revalidation only runs the ownership query"""
+        path = f"/api/v1/student/{self.student.code}/detail"
+        etag = self._etag(path)
+
+        response, queries = self._revalidate(path, etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(queries, 1)
+
+    def test_student_update_changes_the_etag(self):
+        """Verify the detail is sent again once the student row changes"""
+        path = f"/api/v1/student/{self.student.code}/detail"
+        etag = self._etag(path)
+
+        Student.objects.get(code=self.student.code).save()
+        response, _ = self._revalidate(path, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_month_rollover_changes_the_etag(self):
+        """Verify the detail's payed flag is not revalidated across months"""
+        path = f"/api/v1/student/{self.student.code}/detail"
+        etag = self._etag(path)
+
+        class NextMonth(date):
+            @classmethod
+            def today(cls):
+                today = date.today()
+                return cls(today.year + today.month // 12, today.month % 12 + 1, 1)
+
+        with mock.patch("stu.etags.date", NextMonth):
+            response, _ = self._revalidate(path, etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_row_writes_change_the_student_etags(self):
+        """Verify writes to sessions, attendance and payments invalidate the student's ETags"""
+        paths = [
+            f"/api/v1/chapters/{self.student.code}/completions",
+            f"/api/v1/payments/{self.student.code}/all",
+            f"/api/v1/student/{self.student.code}/attendance-history",
+            f"/api/v1/student/{self.student.code}/dashboard",
+        ]
+        writes = [
+            lambda: CompletedChapter.objects.create(
+                student=self.student, chapter=self.fatiha, session_type="review"
+            ),
+            lambda: Payment.objects.create(
+                student=self.student, doctor=self.doctor, year=2024, month=3, amount=10
+            ),
+            lambda: Attendance.objects.create(
+                student=self.student, attendance_date=date(2024, 3, 4), state="present"
+            ),
+        ]
+        for write in writes:
+            etags = {path: self._etag(path) for path in paths}
+            write()
+            for path, etag in etags.items():
+                with self.subTest(path=path):
+                    response, _ = self._revalidate(path, etag)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_query_string_is_part_of_the_etag(self):
+        """Verify pages of a list are validated separately"""
+        path = f"/api/v1/chapters/{self.student.code}/completions"
+
+        self.assertNotEqual(self._etag(path), self._etag(f"{path}?limit=1"))
+
+    def test_student_portal_history_returns_304(self):
+        """Verify the unauthenticated portal histories are revalidated too"""
+        path = f"/api/v1/student/{self.student.code}/memorization-history"
+        etag = self._etag(path)
+
+        response, _ = self._revalidate(path, etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_doctor_payment_reports_follow_the_doctor_version(self):
+        """Verify the monthly report and total are revalidated until a payment is written"""
+        for path in ("/api/v1/payments/all?year=2024&month=3", "/api/v1/payments/total"):
+            with self.subTest(path=path):
+                etag = self._etag(path)
+                response, queries = self._revalidate(path, etag)
+                self.assertEqual((response.status_code, queries), (304, 0))
+
+                Payment.objects.create(
+                    student=self.student, doctor=self.doctor, year=2024, month=3, amount=10
+                )
+                response, _ = self._revalidate(path, etag)
+                self.assertEqual(response.status_code, 200)
+                Payment.objects.all().delete()
@@ -7,6 +7,7 @@ urlpatterns = [
     # Teacher/Doctor endpoints
     path("list", views.list_students_view.as_view(), name="list"),
     path("create", views.create_student_view.as_view(), name="create"),
+    path("statistics", student_stats.doctor_statistics_view, name="doctor_statistics"),
     path("<int:student>/update", views.update_student_view.as_view(), name="update"),
     path("<int:student>/delete", views.delete_student_view.as_view(), name="delete"),
     path("<int:student>/detail", views.student_detail_view.as_view(), name="detail"),
@@ -21,4 +22,5 @@ urlpatterns = [
     path("<int:student_code>/attendance-history", student_stats.student_attendance_history_view, name="student_attendance_history"),
     path("<int:student_code>/payment-history", student_stats.student_payment_history_view, name="student_payment_history"),
     path("<int:student_code>/statistics", student_stats.student_statistics_view, name="student_statistics"),
+    path("<int:student_code>/dashboard", student_stats.student_dashboard_view, name="student_dashboard"),
 ]
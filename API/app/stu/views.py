@@ -1,30 +1,90 @@
 from api.views import authentication_decorator
+from api.transactions import write_transaction
+from api.response_cache import cached_response
+from .etags import student_condition
 from rest_framework import generics
+from .permissions import student_owner_permission
 from rest_framework.exceptions import ValidationError
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.db.utils import IntegrityError
+from django.db.models import OuterRef, Subquery
 from rest_framework import status
 from rest_framework.response import Response
 from .models import Student
-from functools import wraps
 from api.serializers import code_serializer, success_serializer
 from .serializers import student_serializer, student_detail_serializer, student_list_serializer
-
-
-def student_action_decorator(func):
-    @wraps(func)
-    def wrapper(request, *args, **kwargs):
-        student_code = kwargs.get("student")
-        student = Student.objects.filter(code=student_code).first()
-        if not student_code or not student:
-            raise ValidationError("Student not found")
-        if student.doctor.code != getattr(request, "code", None):
-            raise ValidationError("Permission denied")
-        request.student = student
-        return func(request, *args, **kwargs)
-
-    return wrapper
+from chap.models import CompletedChapter
+from eig.models import CompletedQuarter
+from att.models import Attendance
+from att.serializers import date_serializer
+from pay.models import Payment
+from datetime import date
+
+SESSION_TYPES = ("review", "memorization")
+ROSTER_INCLUDES = ("attendance", "payment")
+
+
+def annotate_next_sessions(queryset):
+    """
+    Annotate each student with the latest planned review and memorization
+    session, for both the chapter and the eighth methods, so the whole roster
+    is served by a single query
+    """
+    annotations = {}
+    for session_type in SESSION_TYPES:
+        prefix = f"next_{session_type}"
+        latest_chapter = CompletedChapter.objects.filter(
+            student=OuterRef("pk"),
+            session_type=session_type,
+            next_surah__isnull=False,
+        ).order_by("-created_at", "-code")
+        latest_quarter = CompletedQuarter.objects.filter(
+            student=OuterRef("pk"),
+            session_type=session_type,
+            next_hizb_number__isnull=False,
+        ).order_by("-created_at", "-code")
+        annotations.update(
+            {
+                f"{prefix}_surah": Subquery(
+                    latest_chapter.values("next_surah")[:1]
+                ),
+                f"{prefix}_verse_from": Subquery(
+                    latest_chapter.values("next_verse_from")[:1]
+                ),
+                f"{prefix}_verse_to": Subquery(
+                    latest_chapter.values("next_verse_to")[:1]
+                ),
+                f"{prefix}_hizb_number": Subquery(
+                    latest_quarter.values("next_hizb_number")[:1]
+                ),
+                f"{prefix}_eighth_number": Subquery(
+                    latest_quarter.values("next_eighth_number")[:1]
+                ),
+            }
+        )
+    return queryset.annotate(**annotations)
+
+
+def annotate_day(queryset, day, include):
+    """
+    Annotate each student with the attendance state on day and the payment
+    amount of day's month, as subqueries of the roster query
+    """
+    annotations = {}
+    if "attendance" in include:
+        annotations["attendance_state"] = Subquery(
+            Attendance.objects.filter(
+                student=OuterRef("pk"), attendance_date=day
+            ).values("state")[:1]
+        )
+    if "payment" in include:
+        annotations["payment_amount"] = Subquery(
+            Payment.objects.filter(
+                student=OuterRef("pk"), month=day.month, year=day.year
+            ).values("amount")[:1]
+        )
+    return queryset.annotate(**annotations)
 
 
 class create_student_view(generics.CreateAPIView):
@@ -33,6 +93,7 @@ class create_student_view(generics.CreateAPIView):
 
     @method_decorator(csrf_exempt)
     @method_decorator(authentication_decorator)
+    @method_decorator(write_transaction)
     def create(self, request, *args, **kwargs):
         """
         Create a new student
@@ -51,13 +112,14 @@ class create_student_view(generics.CreateAPIView):
 
 
 class update_student_view(generics.UpdateAPIView):
+    permission_classes = [student_owner_permission]
     queryset = Student.objects.all()
     serializer_class = student_serializer
     lookup_field = "code"
 
     @method_decorator(csrf_exempt)
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def update(self, request, *args, **kwargs):
         """
         Update a student's information
@@ -77,13 +139,14 @@ class update_student_view(generics.UpdateAPIView):
 
 
 class delete_student_view(generics.DestroyAPIView):
+    permission_classes = [student_owner_permission]
     queryset = Student.objects.all()
     serializer_class = student_serializer
     lookup_field = "code"
 
     @method_decorator(csrf_exempt)
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(write_transaction)
     def delete(self, request, *args, **kwargs):
         """
         Delete a student by code
@@ -98,13 +161,14 @@ class delete_student_view(generics.DestroyAPIView):
 
 
 class student_detail_view(generics.RetrieveAPIView):
+    permission_classes = [student_owner_permission]
     queryset = Student.objects.all()
     serializer_class = student_detail_serializer
     lookup_field = "code"
 
     @method_decorator(csrf_exempt)
     @method_decorator(authentication_decorator)
-    @method_decorator(student_action_decorator)
+    @method_decorator(student_condition("detail"))
     def get(self, request, *args, **kwargs):
         """
         Get student details by code
@@ -116,12 +180,44 @@ class student_detail_view(generics.RetrieveAPIView):
 class list_students_view(generics.ListAPIView):
     serializer_class = student_list_serializer
 
+    def get_include(self):
+        include = self.request.query_params.get("include")
+        if not include:
+            return set()
+        include = set(include.split(","))
+        unknown = include - set(ROSTER_INCLUDES)
+        if unknown:
+            raise ValidationError(f"Unknown include: {', '.join(sorted(unknown))}")
+        return include
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include"] = self.get_include()
+        return context
+
     @method_decorator(csrf_exempt)
     @method_decorator(authentication_decorator)
+    @method_decorator(cached_response("roster"))
     def get(self, request, *args, **kwargs):
         """
         Get all students for the authenticated doctor
+        Query params:
+        - include: comma separated extras, "attendance" (state on date)
+          and/or "payment" (amount paid for date's month)
+        - date: YYYY-MM-DD format (defaults to today)
         """
-        students = Student.objects.filter(doctor=request.doctor).order_by('-date_of_registration')
+        students = annotate_next_sessions(
+            Student.objects.filter(doctor_id=request.code)
+        ).order_by('-date_of_registration')
+        include = self.get_include()
+        if include:
+            day = date.today()
+            if request.query_params.get("date"):
+                date_serializer_instance = date_serializer(
+                    data={"date": request.query_params["date"]}
+                )
+                date_serializer_instance.is_valid(raise_exception=True)
+                day = date_serializer_instance.validated_data["date"]
+            students = annotate_day(students, day, include)
         serializer = self.get_serializer(students, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
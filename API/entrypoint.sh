@@ -6,6 +6,33 @@ cd /app
 # Run migrations (safe to run on every start)
 python3 manage.py migrate --noinput
 
+# Reference tables (surahs, hizbs); rows are keyed by code so this is idempotent
+python3 manage.py loaddata chap/initial_data.json eig/initial_data.json
+
+# Per-doctor shards get the full schema and their own copy of the reference tables
+for index in $(seq 0 $((${SHARD_COUNT:-0} - 1))); do
+  python3 manage.py migrate --noinput --database "shard_${index}"
+  python3 manage.py loaddata --database "shard_${index}" chap/initial_data.json eig/initial_data.json
+done
+
+# Refresh planner statistics and checkpoint the WAL before serving
+if [ "${SQLITE_PRODUCTION}" = "True" ]; then
+  python3 manage.py sqlite_maintenance
+  for index in $(seq 0 $((${SHARD_COUNT:-0} - 1))); do
+    python3 manage.py sqlite_maintenance --database "shard_${index}"
+  done
+fi
+
+# Share the response cache (and the doctors' data versions) between workers
+export CACHE_BACKEND="${CACHE_BACKEND:-django.core.cache.backends.filebased.FileBasedCache}"
+export CACHE_LOCATION="${CACHE_LOCATION:-/tmp/circle-cache}"
+
+# Workers write their Prometheus metrics to files in METRICS_DIR; values of
+# a previous run would be added to this one's
+export METRICS_DIR="${METRICS_DIR:-/tmp/circle-metrics}"
+mkdir -p "${METRICS_DIR}"
+rm -f "${METRICS_DIR}"/values_*.db
+
 # Start Gunicorn
 HOST="0.0.0.0"
 PORT="${PORT:-8000}"
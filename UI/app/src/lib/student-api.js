@@ -25,6 +25,37 @@ export function getStudentStatistics(studentCode, options) {
   });
 }
 
+// Student Dashboard: statistics plus the most recent entries of each history
+// params: { memorization_limit, review_limit, attendance_limit, payment_limit }
+export function getStudentDashboard(studentCode, params, options) {
+  return apiFetch(`/student/${encodeURIComponent(studentCode)}/dashboard`, {
+    method: "GET",
+    params,
+    ...(options || {}),
+  });
+}
+
+// Rest of a history after a page already loaded (e.g. the dashboard's),
+// following next_cursor until the last page
+// section: "memorization", "review", "attendance" or "payment"
+export async function getRemainingStudentHistory(studentCode, section, page, options) {
+  const results = [...page.results];
+  let cursor = page.next_cursor;
+  while (cursor) {
+    const next = await apiFetch(
+      `/student/${encodeURIComponent(studentCode)}/${section}-history`,
+      {
+        method: "GET",
+        params: { cursor, limit: 500 },
+        ...(options || {}),
+      }
+    );
+    results.push(...next.results);
+    cursor = next.next_cursor;
+  }
+  return results;
+}
+
 // Student Memorization History
 export function getStudentMemorizationHistory(studentCode, options) {
   return apiFetch(
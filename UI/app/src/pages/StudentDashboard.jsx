@@ -18,11 +18,8 @@ import {
   BarChart3,
 } from "lucide-react";
 import {
-  getStudentStatistics,
-  getStudentMemorizationHistory,
-  getStudentReviewHistory,
-  getStudentAttendanceHistory,
-  getStudentPaymentHistory,
+  getRemainingStudentHistory,
+  getStudentDashboard,
 } from "../lib/student-api";
 
 function StudentDashboard() {
@@ -56,20 +53,23 @@ function StudentDashboard() {
   const fetchAllData = async (studentCode) => {
     try {
       setLoading(true);
-      const [stats, memorization, review, attendance, payments] =
-        await Promise.all([
-          getStudentStatistics(studentCode),
-          getStudentMemorizationHistory(studentCode),
-          getStudentReviewHistory(studentCode),
-          getStudentAttendanceHistory(studentCode),
-          getStudentPaymentHistory(studentCode),
-        ]);
-
-      setStatistics(stats);
+      const dashboard = await getStudentDashboard(studentCode);
+      // The dashboard only carries the first page of each history
+      const [memorization, review, attendance, payment] = await Promise.all(
+        ["memorization", "review", "attendance", "payment"].map((section) =>
+          getRemainingStudentHistory(
+            studentCode,
+            section,
+            dashboard[`${section}_history`]
+          )
+        )
+      );
+
+      setStatistics(dashboard.statistics);
       setMemorizationHistory(memorization);
       setReviewHistory(review);
       setAttendanceHistory(attendance);
-      setPaymentHistory(payments);
+      setPaymentHistory(payment);
     } catch (error) {
       console.error("Error fetching data:", error);
     } finally {
@@ -122,65 +122,39 @@ function StudentsList() {
       setLoadingStudents(true);
       setStudentsError("");
       try {
-        const data = await listStudents();
-        console.log("Fetched students:", data);
-
         // Get today's date for attendance lookup
         const today = new Date().toISOString().split("T")[0];
 
-        // Map backend data to UI format and load today's attendance
-        const mapped = await Promise.all(
-          (data || []).map(async (s) => {
-            let todayAttendance = null;
-
-            // Try to load today's attendance for this student
-            try {
-              const now = new Date();
-              const attendanceRecords = await getAttendanceRecord(
-                s.code,
-                now.getFullYear(),
-                now.getMonth() + 1
-              );
-
-              // Find today's attendance record
-              const todayRecord = attendanceRecords?.find(
-                (record) => record.attendance_date === today
-              );
-
-              if (todayRecord) {
-                todayAttendance = todayRecord.state; // "present" or "absent"
-              }
-            } catch (error) {
-              // If attendance fetch fails, just continue with null
-              console.log(
-                `Could not load attendance for student ${s.code}:`,
-                error
-              );
-            }
-
-            return {
-              id: s.code, // Use code as id
-              code: s.code,
-              name: s.name,
-              gender: s.gender === "M" ? "male" : "female",
-              age: s.age,
-              memorization: s.next_memorization_session || "لم يتم التحديد", // Display next memorization session
-              review: s.next_review_session || "لم يتم التحديد", // Display next review session
-              attendance: todayAttendance, // Set from database (null, "present", or "absent")
-              level: "", // Not in list response
-              enrollmentDate:
-                s.date_of_registration ||
-                new Date().toISOString().split("T")[0],
-              memorizationStart: s.memorization_method || "",
-              memorization_method: s.memorization_method, // Keep for session pages
-              guardianName: "", // Not in list response
-              phone: "", // Not in list response
-              monthlyPayment: "unpaid", // Not in list response
-              photo: null,
-              sessions: { memorization: [], review: [] },
-            };
-          })
-        );
+        // Today's attendance and this month's payment come with the roster
+        const data = await listStudents({
+          params: { include: "attendance,payment", date: today },
+        });
+        console.log("Fetched students:", data);
+
+        // Map backend data to UI format
+        const mapped = (data || []).map((s) => {
+          return {
+            id: s.code, // Use code as id
+            code: s.code,
+            name: s.name,
+            gender: s.gender === "M" ? "male" : "female",
+            age: s.age,
+            memorization: s.next_memorization_session || "لم يتم التحديد", // Display next memorization session
+            review: s.next_review_session || "لم يتم التحديد", // Display next review session
+            attendance: s.attendance, // Set from database (null, "present", or "absent")
+            level: "", // Not in list response
+            enrollmentDate:
+              s.date_of_registration ||
+              new Date().toISOString().split("T")[0],
+            memorizationStart: s.memorization_method || "",
+            memorization_method: s.memorization_method, // Keep for session pages
+            guardianName: "", // Not in list response
+            phone: "", // Not in list response
+            monthlyPayment: s.payment !== null ? "paid" : "unpaid",
+            photo: null,
+            sessions: { memorization: [], review: [] },
+          };
+        });
 
         setStudents(mapped);
       } catch (e) {